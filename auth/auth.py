@@ -15,6 +15,9 @@ router = APIRouter()
 @router.post("/registration", response_model=RegistrationResponse)
 async def registration(user: RegistrationUserCreate, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)) -> RegistrationResponse:
     try:
+        # Хешируем до начала транзакции, чтобы не держать соединение из пула
+        hashed_password = await get_password_hash(user.password)
+
         async with db.begin():
             result_user = await db.execute(select(User).filter(User.c.email == user.email))
             existing_user = result_user.scalars().first()
@@ -25,8 +28,6 @@ async def registration(user: RegistrationUserCreate, background_tasks: Backgroun
                     detail="Email already registered"
                 )
 
-            hashed_password = get_password_hash(user.password)
-
             new_user = {
                 "email": user.email,
                 "username": user.username,
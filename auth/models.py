@@ -1,4 +1,4 @@
-from sqlalchemy import MetaData, Table, Column, Integer, String, ForeignKey, Boolean, JSON
+from sqlalchemy import MetaData, Table, Column, Integer, String, ForeignKey, Boolean, JSON, DateTime, func
 from models import metadata
 
 Role = Table(
@@ -12,20 +12,21 @@ User = Table(
     "user",
     metadata,
     Column("id", Integer, primary_key=True),
-    Column("email", String, nullable=False),
-    Column("role_id", Integer, ForeignKey("role.id")),
+    Column("email", String, nullable=False, unique=True, index=True),
+    Column("role_id", Integer, ForeignKey("role.id"), index=True),
     Column("hashed_password", String, nullable=False),
-    Column("username", String, nullable=True),
+    Column("username", String, nullable=True, index=True),
     Column("first_name", String, nullable=True),
     Column("last_name", String, nullable=True),
     Column("phone", String, nullable=True),
-    Column("is_verified", Boolean, default=False),
+    Column("is_verified", Boolean, default=False, index=True),
+    Column("created_at", DateTime(timezone=True), nullable=False, server_default=func.now(), index=True),
 )
 
 Verif_code = Table(
     "verif_code",
     metadata,
     Column("id", Integer, primary_key=True),
-    Column("user_id", Integer, ForeignKey("user.id")),
+    Column("user_id", Integer, ForeignKey("user.id"), index=True),
     Column("code", Integer, nullable=False),
 )
\ No newline at end of file
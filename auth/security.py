@@ -3,10 +3,13 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
 from auth.jwt_handler import verify_token
 from auth.models import User
+from cache import Cache
+from config import ROLE_CACHE_TTL
 from database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 
 security = HTTPBearer()
+role_cache = Cache("role", ttl=ROLE_CACHE_TTL)
 
 async def check_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -37,12 +40,31 @@ async def check_admin(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    result = await db.execute(select(User).filter(User.c.id == payload['sub']))
-    info_user_data = result.fetchone()
-    if info_user_data.role_id != 2:
+    role_id = await get_user_role(payload['sub'], db)
+    if role_id != 2:
         raise HTTPException(
             status_code=status.HTTP_423_LOCKED,
             detail="Not an admin",
         )
 
-    return info_user_data
\ No newline at end of file
+    return payload
+
+async def get_user_role(user_id: int, db: AsyncSession):
+    # Роль кешируется по id пользователя; кеш сбрасывается
+    # при изменении и удалении пользователя в users_management
+    role_id = await role_cache.get(user_id)
+    if role_id is not None:
+        return role_id
+
+    result = await db.execute(select(User.c.role_id).filter(User.c.id == user_id))
+    user = result.fetchone()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if user.role_id is not None:
+        await role_cache.set(user_id, user.role_id)
+    return user.role_id
\ No newline at end of file
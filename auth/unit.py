@@ -1,22 +1,77 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from auth.models import User
+from config import PASSWORD_HASH_CONCURRENCY
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+# bcrypt занимает ~100–300 мс CPU, поэтому хеширование выполняется в
+# отдельном пуле потоков, а не в event loop. Размер пула — единственный
+# лимит: лишние задачи ждут в очереди исполнителя.
+hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_CONCURRENCY, thread_name_prefix="password-hash")
+hash_pool_stats = {
+    "concurrency": PASSWORD_HASH_CONCURRENCY,
+    "waiting": 0,
+    "running": 0,
+    "completed": 0,
+    "wait_seconds_total": 0.0,
+    "wait_seconds_max": 0.0,
+}
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def run_in_hash_pool(func, *args):
+    stats = hash_pool_stats
+    loop = asyncio.get_running_loop()
+    submitted = time.perf_counter()
+    state = {"started": False, "finished": False}
+
+    def started():
+        if state["finished"]:
+            return
+        state["started"] = True
+        wait = time.perf_counter() - submitted
+        stats["waiting"] -= 1
+        stats["running"] += 1
+        stats["wait_seconds_total"] += wait
+        stats["wait_seconds_max"] = max(stats["wait_seconds_max"], wait)
+
+    def task():
+        # Счётчики меняются только в потоке event loop
+        loop.call_soon_threadsafe(started)
+        return func(*args)
+
+    stats["waiting"] += 1
+    try:
+        return await loop.run_in_executor(hash_executor, task)
+    finally:
+        state["finished"] = True
+        if state["started"]:
+            stats["running"] -= 1
+            stats["completed"] += 1
+        else:
+            # Запрос отменён, пока задача ждала в очереди
+            stats["waiting"] -= 1
+
+async def verify_password(plain_password, hashed_password):
+    return await run_in_hash_pool(pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash(password):
+    return await run_in_hash_pool(pwd_context.hash, password)
 
 async def authenticate_user(email: str, password: str, db: AsyncSession) -> dict:
+    # Транзакцию вызывающего не трогаем; свою транзакцию чтения закрываем,
+    # чтобы соединение вернулось в пул на время проверки пароля
+    own_transaction = not db.in_transaction()
     query = select(User).where(User.c.email == email)
     result = await db.execute(query)
     user_record = result.first()
+    if own_transaction:
+        await db.commit()
 
     if user_record:
-        if verify_password(password, user_record.hashed_password):
+        if await verify_password(password, user_record.hashed_password):
             return {'id': user_record.id}
     return None
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from auth.models import User, Verif_code
 from auth.security import check_user
 from database import get_db
+from users_management.unit import invalidate_user_info
 
 router = APIRouter()
 
@@ -25,16 +26,20 @@ async def verification(
                 detail="User not found"
             )
         
-        if data.verification_code == user.code:
+        verified = data.verification_code == user.code
+        if verified:
             result1 = await db.execute(update(User).where(User.c.id == payload['sub']).values(is_verified=True))
             result2 = await db.execute(delete(Verif_code).where(Verif_code.c.user_id == payload['sub']))
 
-            return VerificationResponse(
-                status=True,
-                message="User verified successfully"
-            )
-        else:
-            return VerificationResponse(
-                status=False,
-                message="Invalid verification code"
-            )
\ No newline at end of file
+    if not verified:
+        return VerificationResponse(
+            status=False,
+            message="Invalid verification code"
+        )
+
+    await invalidate_user_info(payload['sub'])
+
+    return VerificationResponse(
+        status=True,
+        message="User verified successfully"
+    )
\ No newline at end of file
@@ -0,0 +1,227 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+import redis.asyncio as redis
+from config import CACHE_BACKEND, CACHE_MAX_ENTRIES, CATALOG_CACHE_TTL, REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """LRU-кеш в памяти процесса с TTL на каждую запись."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._counters = {}
+
+    async def get(self, key: str):
+        item = self._data.get(key)
+        if item is None:
+            return None
+
+        value, expires_at = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value, ttl: int):
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def delete(self, key: str):
+        self._data.pop(key, None)
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+
+_redis_client = None
+
+
+def get_redis():
+    # Общий клиент Redis; пул подключений создаётся при первом обращении
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.from_url(REDIS_URL)
+    return _redis_client
+
+
+async def close_redis():
+    global _redis_client
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
+
+
+class RedisBackend:
+    """Кеш в Redis, общий для всех воркеров. Значения хранятся в JSON."""
+
+    @property
+    def client(self):
+        return get_redis()
+
+    async def get(self, key: str):
+        raw = await self.client.get(key)
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value, ttl: int):
+        await self.client.set(key, json.dumps(value), ex=ttl)
+
+    async def delete(self, key: str):
+        await self.client.delete(key)
+
+    async def get_counter(self, key: str) -> int:
+        return int(await self.client.get(key) or 0)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+
+def make_backend(name: str = CACHE_BACKEND):
+    if name == "redis":
+        return RedisBackend()
+    return MemoryBackend()
+
+
+caches = []
+
+
+class Cache:
+    """
+    Кеш с пространством имён и счётчиками попаданий.
+
+    Ошибки бэкенда не пробрасываются: недоступный Redis превращается
+    в промах, и запрос идёт в базу как без кеша.
+    """
+
+    def __init__(self, namespace: str, ttl: int, backend=None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.backend = backend or make_backend()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._locks = {}
+        self._lock_users = {}
+        caches.append(self)
+
+    def _key(self, key) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key):
+        try:
+            value = await self.backend.get(self._key(key))
+        except Exception:
+            logger.exception("Cache error in %s", self.namespace)
+            self.errors += 1
+            value = None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key, value, ttl: int = None):
+        if not self.ttl:
+            return
+        try:
+            await self.backend.set(self._key(key), value, ttl or self.ttl)
+        except Exception:
+            logger.exception("Cache error in %s", self.namespace)
+            self.errors += 1
+
+    async def delete(self, key):
+        try:
+            await self.backend.delete(self._key(key))
+        except Exception:
+            logger.exception("Cache error in %s", self.namespace)
+            self.errors += 1
+
+    async def get_or_load(self, key, loader):
+        """
+        Read-through: при промахе значение загружает loader().
+
+        Одновременные промахи по одному ключу в процессе ждут одну
+        загрузку, а не идут в базу каждый сам по себе.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        # Блокировка удаляется, когда её не держит и не ждёт ни один
+        # вызов, иначе новый вызов создал бы вторую и начал ещё одну загрузку
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._lock_users[key] = self._lock_users.get(key, 0) + 1
+        try:
+            async with lock:
+                try:
+                    value = await self.backend.get(self._key(key))
+                except Exception:
+                    value = None
+                if value is None:
+                    value = await loader()
+                    await self.set(key, value)
+        finally:
+            self._lock_users[key] -= 1
+            if not self._lock_users[key]:
+                del self._lock_users[key]
+                del self._locks[key]
+        return value
+
+    async def version(self) -> int:
+        try:
+            return await self.backend.get_counter(self._key("version"))
+        except Exception:
+            logger.exception("Cache error in %s", self.namespace)
+            self.errors += 1
+            return 0
+
+    async def bump_version(self):
+        # Ключи содержат версию, поэтому её увеличение разом
+        # делает недоступными все ранее закешированные значения
+        try:
+            await self.backend.incr(self._key("version"))
+        except Exception:
+            logger.exception("Cache error in %s", self.namespace)
+            self.errors += 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+def make_key(params) -> str:
+    # Нормализованный ключ из параметров запроса (pydantic-модели)
+    return json.dumps(params.dict(), sort_keys=True, separators=(",", ":"), default=str)
+
+
+def cache_stats() -> dict:
+    return {cache.namespace: cache.stats() for cache in caches}
+
+
+catalog_cache = Cache("catalog", ttl=CATALOG_CACHE_TTL)
+
+
+async def get_catalog(key: str, loader, version: int = None):
+    # Каталог версионируется: запись в product/category увеличивает версию
+    if version is None:
+        version = await catalog_cache.version()
+    return await catalog_cache.get_or_load(f"{version}:{key}", loader)
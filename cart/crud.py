@@ -1,11 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Path
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import delete, select
 from auth.security import check_user
-from cart.models import Cart
-from product_management.models import Product
-from cart.schemas import CartAdd, CartItemResponse, DeleteItemResponse
+from cart.schemas import CartAdd, CartAddBatch, CartBatchResponse, CartItemResponse, DeleteItemResponse
+from cart.store import cart_store
+from cart.unit import merge_items
 from database import get_db
+from users_management.unit import invalidate_user_info
 
 router = APIRouter()
 
@@ -18,18 +18,7 @@ async def add_to_cart(
     
     try:
         async with db.begin():
-            stmt = select(Product).where(Product.c.id == data.product_id, Product.c.is_available == True)
-            result = await db.execute(stmt)
-            product = result.fetchone()
-
-            if not product:
-                raise HTTPException(status_code=404, detail="Product not found or unavailable")
-
-            new_product = data.dict()
-            new_product["user_id"] = payload['sub']
-            await db.execute(
-                Cart.insert().values(new_product)
-            )
+            await cart_store.add(payload['sub'], {data.product_id: data.quantity}, db)
             
     except HTTPException as http_exc:
         raise http_exc
@@ -41,6 +30,8 @@ async def add_to_cart(
             detail="Internal Server Error: Could not add item to cart"
         )
 
+    await invalidate_user_info(payload['sub'])
+
     return CartItemResponse(
         status=True,
         message="Item added to cart successfully",
@@ -48,16 +39,48 @@ async def add_to_cart(
     )
 
 
+@router.post("/cart/batch", response_model=CartBatchResponse)
+async def add_to_cart_batch(
+    data: CartAddBatch,
+    payload=Depends(check_user),
+    db: AsyncSession = Depends(get_db)
+) -> CartBatchResponse:
+    quantities = merge_items(data.items)
+
+    try:
+        async with db.begin():
+            await cart_store.add(payload['sub'], quantities, db)
+
+    except HTTPException as http_exc:
+        raise http_exc
+    
+    except Exception as e:
+        print(f"Error occurred: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Internal Server Error: Could not add items to cart"
+        )
+
+    await invalidate_user_info(payload['sub'])
+
+    return CartBatchResponse(
+        status=True,
+        message="Items added to cart successfully",
+        items=[CartAdd(product_id=product_id, quantity=quantity) for product_id, quantity in quantities.items()]
+    )
+
+
 @router.delete("/cart/{id}")
 async def delete_item_from_cart(
-    id: int,
+    # У корзины в Redis нет строк с собственным id, поэтому смысл id зависит от хранилища
+    id: int = Path(..., description="id строки корзины при CART_BACKEND=postgres, product_id при redis и memory"),
     payload=Depends(check_user),
     db: AsyncSession = Depends(get_db)
 ) -> DeleteItemResponse:
     try:
         async with db.begin():
-            stmt = await db.execute(delete(Cart).where(Cart.c.id == id and Cart.c.user_id == payload['sub']))
-            if stmt.rowcount == 0:
+            removed = await cart_store.remove(payload['sub'], id, db)
+            if not removed:
                 raise HTTPException(
                     status_code=404,
                     detail=f"Item with id {id} not found"
@@ -73,6 +96,8 @@ async def delete_item_from_cart(
             detail="Internal Server Error: Could not delete item from cart"
         )
 
+    await invalidate_user_info(payload['sub'])
+
     return DeleteItemResponse(status=True, message=f"Item with id {id} deleted")
 
 
@@ -83,7 +108,7 @@ async def clear_cart(
 ) -> DeleteItemResponse:
     try:
         async with db.begin():
-            stmt = await db.execute(delete(Cart).where(Cart.c.user_id == payload['sub']))
+            await cart_store.clear(payload['sub'], db)
 
     except Exception as e:
         print(f"Error occurred: {e}")
@@ -92,4 +117,6 @@ async def clear_cart(
             detail="Internal Server Error: Could not clear cart"
         )
     
+    await invalidate_user_info(payload['sub'])
+
     return DeleteItemResponse(status=True, message="All items in cart deleted")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, String, ForeignKey, Boolean, JSON, Text
+from sqlalchemy import Table, Column, Integer, String, ForeignKey, Boolean, JSON, Text, UniqueConstraint
 from models import metadata
 
 Cart = Table(
@@ -8,4 +8,6 @@ Cart = Table(
     Column("user_id", Integer, ForeignKey("user.id")),
     Column("product_id", Integer, ForeignKey("product.id")),
     Column("quantity", Integer, nullable=False, default=1),
+    # Одна строка на товар: повторное добавление увеличивает quantity
+    UniqueConstraint("user_id", "product_id", name="uq_cart_user_id_product_id"),
 )
\ No newline at end of file
@@ -1,5 +1,6 @@
 from typing import List, Optional
 from pydantic import BaseModel, Field
+from config import CART_BATCH_MAX_ITEMS
 
 class CartAdd(BaseModel):
     product_id: int = Field(..., description="ID товара")
@@ -10,6 +11,14 @@ class CartItemResponse(BaseModel):
     message: str
     item: CartAdd
 
+class CartAddBatch(BaseModel):
+    items: List[CartAdd] = Field(..., min_length=1, max_length=CART_BATCH_MAX_ITEMS, description="Товары для добавления")
+
+class CartBatchResponse(BaseModel):
+    status: bool
+    message: str
+    items: List[CartAdd]
+
 class DeleteItemResponse(BaseModel):
     status: bool
     message: str
\ No newline at end of file
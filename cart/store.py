@@ -0,0 +1,311 @@
+import time
+import uuid
+from collections import namedtuple
+from datetime import timedelta
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from cache import get_redis
+from cart.models import Cart
+from cart.unit import check_products_available, upsert_cart_items
+from config import CART_BACKEND, CART_CHECKOUT_TTL, CART_TTL_DAYS
+from product_management.models import Product
+from product_management.unit import get_available_product_ids
+
+# Строка корзины при оформлении заказа (те же поля, что у строк из Postgres)
+CartLine = namedtuple("CartLine", ["product_id", "quantity", "price"])
+
+# Оформление заказа забирает корзину cart:{id} под ключ cart:{id}:checkout
+# одним атомарным шагом, поэтому товары, добавленные после этого, попадают
+# в новую корзину. Ключ cart:{id}:checkout:lock с токеном оформления живёт
+# CART_CHECKOUT_TTL секунд. Пока он есть, оформление идёт. Без него забранные
+# товары считаются брошенными (процесс упал или не успел) и возвращаются
+# в корзину при следующем чтении или оформлении, а не теряются.
+# KEYS: корзина, забранная корзина, блокировка;
+# ARGV: токен оформления, TTL корзины, TTL блокировки (секунды)
+MERGE_CLAIM = """
+local claimed = redis.call("HGETALL", KEYS[2])
+for i = 1, #claimed, 2 do
+    redis.call("HINCRBY", KEYS[1], claimed[i], claimed[i + 1])
+end
+redis.call("DEL", KEYS[2])
+if #claimed > 0 then redis.call("EXPIRE", KEYS[1], ARGV[2]) end
+"""
+
+# Товары корзины (с возвратом брошенного оформления)
+ITEMS_SCRIPT = """
+if redis.call("EXISTS", KEYS[3]) == 0 then
+""" + MERGE_CLAIM + """
+end
+return redis.call("HGETALL", KEYS[1])
+"""
+
+# 0 — оформление этой корзины уже идёт
+CLAIM_SCRIPT = """
+if redis.call("EXISTS", KEYS[3]) == 1 then return 0 end
+""" + MERGE_CLAIM + """
+if redis.call("EXISTS", KEYS[1]) == 0 then return {} end
+redis.call("RENAME", KEYS[1], KEYS[2])
+redis.call("SET", KEYS[3], ARGV[1], "EX", ARGV[3])
+return redis.call("HGETALL", KEYS[2])
+"""
+
+# Перед коммитом заказа: продлевает блокировку, если она ещё наша.
+# 0 — блокировка истекла и корзину забрало другое оформление
+CONFIRM_SCRIPT = """
+if redis.call("GET", KEYS[3]) ~= ARGV[1] then return 0 end
+redis.call("EXPIRE", KEYS[3], ARGV[3])
+return 1
+"""
+
+# Заказ создан: забранная корзина удаляется
+DONE_SCRIPT = """
+local owner = redis.call("GET", KEYS[3])
+if owner and owner ~= ARGV[1] then return 0 end
+redis.call("DEL", KEYS[2], KEYS[3])
+return 1
+"""
+
+# Заказ не создан: товары возвращаются в корзину
+RESTORE_SCRIPT = """
+local owner = redis.call("GET", KEYS[3])
+if owner and owner ~= ARGV[1] then return 0 end
+""" + MERGE_CLAIM + """
+redis.call("DEL", KEYS[3])
+return 1
+"""
+
+
+class PostgresCartStore:
+    """Корзина в таблице cart. Все операции выполняются в транзакции вызывающего кода."""
+
+    in_database = True
+
+    async def add(self, user_id: int, quantities: dict, db: AsyncSession):
+        await check_products_available(list(quantities), db)
+        await upsert_cart_items(user_id, quantities, db)
+
+    async def remove(self, user_id: int, item_id: int, db: AsyncSession) -> bool:
+        result = await db.execute(delete(Cart).where(Cart.c.id == item_id, Cart.c.user_id == user_id))
+        return result.rowcount > 0
+
+    async def clear(self, user_id: int, db: AsyncSession):
+        await db.execute(delete(Cart).where(Cart.c.user_id == user_id))
+
+    async def items(self, user_id: int, db: AsyncSession) -> list:
+        result = await db.execute(
+            select(Cart.c.product_id, Cart.c.quantity).where(Cart.c.user_id == user_id).order_by(Cart.c.id)
+        )
+        return [{"product_id": item.product_id, "quantity": item.quantity} for item in result.fetchall()]
+
+    async def checkout(self, user_id: int, db: AsyncSession) -> list:
+        # Забираем товары из корзины одним запросом: DELETE ... RETURNING
+        # в CTE, соединённый с product. При ошибке транзакция откатится
+        # и корзина останется на месте.
+        removed = (
+            delete(Cart)
+            .where(Cart.c.user_id == user_id)
+            .returning(Cart.c.product_id, Cart.c.quantity)
+            .cte("removed")
+        )
+        result = await db.execute(
+            select(removed.c.product_id, removed.c.quantity, Product.c.price)
+            .join(Product, Product.c.id == removed.c.product_id)
+            .where(Product.c.is_available == True)
+        )
+        return None, result.fetchall()
+
+    async def checkout_confirm(self, user_id: int, token):
+        # Строки удалены в транзакции заказа, держать их дольше не нужно
+        pass
+
+    async def checkout_done(self, user_id: int, token):
+        pass
+
+    async def checkout_failed(self, user_id: int, token):
+        # Откат транзакции заказа возвращает строки корзины
+        pass
+
+
+class RedisCartStore:
+    """
+    Корзина в хеше Redis cart:{user_id} (product_id -> quantity).
+
+    Postgres не участвует до оформления заказа: доступность товаров
+    проверяется по снимку из кеша каталога, а строки попадают в базу
+    сразу как order_items в create_order. Строк с собственным id у
+    корзины нет, поэтому DELETE /cart/cart/{id} принимает product_id.
+    """
+
+    in_database = False
+
+    def __init__(self, client=None):
+        self._client = client
+        self.checkout_ttl = CART_CHECKOUT_TTL
+
+    @property
+    def client(self):
+        return self._client or get_redis()
+
+    def _key(self, user_id: int) -> str:
+        return f"cart:{user_id}"
+
+    def _checkout_key(self, user_id: int) -> str:
+        return f"cart:{user_id}:checkout"
+
+    async def _run(self, script: str, user_id: int, token: str = ""):
+        keys = [self._key(user_id), self._checkout_key(user_id), f"{self._checkout_key(user_id)}:lock"]
+        args = [token, int(timedelta(days=CART_TTL_DAYS).total_seconds()), self.checkout_ttl]
+        return await self.client.register_script(script)(keys=keys, args=args)
+
+    async def add(self, user_id: int, quantities: dict, db: AsyncSession):
+        missing = set(quantities) - await get_available_product_ids(db)
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Products not found or unavailable: {sorted(missing)}"
+            )
+        await self._increment(user_id, quantities)
+
+    async def _increment(self, user_id: int, quantities: dict):
+        key = self._key(user_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            for product_id, quantity in quantities.items():
+                pipe.hincrby(key, product_id, quantity)
+            pipe.expire(key, timedelta(days=CART_TTL_DAYS))
+            await pipe.execute()
+
+    async def remove(self, user_id: int, item_id: int, db: AsyncSession) -> bool:
+        return await self.client.hdel(self._key(user_id), item_id) > 0
+
+    async def clear(self, user_id: int, db: AsyncSession):
+        # Вместе с брошенным оформлением; идущее оформление не пройдёт checkout_confirm
+        checkout_key = self._checkout_key(user_id)
+        await self.client.delete(self._key(user_id), checkout_key, f"{checkout_key}:lock")
+
+    async def _quantities(self, user_id: int) -> dict:
+        raw = await self._run(ITEMS_SCRIPT, user_id)
+        return {int(product_id): int(quantity) for product_id, quantity in zip(raw[::2], raw[1::2])}
+
+    async def items(self, user_id: int, db: AsyncSession) -> list:
+        quantities = await self._quantities(user_id)
+        return [{"product_id": product_id, "quantity": quantity} for product_id, quantity in sorted(quantities.items())]
+
+    async def _claim(self, user_id: int):
+        token = uuid.uuid4().hex
+        raw = await self._run(CLAIM_SCRIPT, user_id, token)
+        if raw == 0:
+            raise HTTPException(status_code=409, detail="Checkout already in progress")
+        return token, {int(product_id): int(quantity) for product_id, quantity in zip(raw[::2], raw[1::2])}
+
+    async def checkout(self, user_id: int, db: AsyncSession):
+        # Корзина забирается до запроса цен. Возвращает токен оформления
+        # и строки: перед коммитом заказа токен проверяет checkout_confirm,
+        # после коммита забранную корзину удаляет checkout_done, при
+        # ошибке возвращает checkout_failed
+        token, quantities = await self._claim(user_id)
+        if not quantities:
+            return token, []
+
+        result = await db.execute(
+            select(Product.c.id.label("product_id"), Product.c.price)
+            .where(Product.c.id.in_(quantities), Product.c.is_available == True)
+        )
+        return token, [
+            CartLine(product.product_id, quantities[product.product_id], product.price)
+            for product in result.fetchall()
+        ]
+
+    async def checkout_confirm(self, user_id: int, token: str):
+        # Если блокировка истекла, корзину могло забрать другое оформление:
+        # заказ откатывается, иначе товары были бы заказаны дважды
+        if not await self._run(CONFIRM_SCRIPT, user_id, token):
+            raise HTTPException(status_code=409, detail="Checkout expired, please try again")
+
+    async def checkout_done(self, user_id: int, token: str):
+        # Вызывается после коммита заказа. Удаляется вся забранная корзина,
+        # как и в Postgres, где DELETE затрагивает также недоступные товары
+        await self._run(DONE_SCRIPT, user_id, token)
+
+    async def checkout_failed(self, user_id: int, token: str):
+        await self._run(RESTORE_SCRIPT, user_id, token)
+
+
+class MemoryCartStore(RedisCartStore):
+    """Корзина в памяти процесса с тем же поведением, что и RedisCartStore (для тестов)."""
+
+    def __init__(self):
+        self.checkout_ttl = CART_CHECKOUT_TTL
+        self._carts = {}
+        self._claims = {}
+        self._locks = {}  # user_id -> (токен оформления, истекает в)
+
+    async def _increment(self, user_id: int, quantities: dict):
+        cart = self._carts.setdefault(user_id, {})
+        for product_id, quantity in quantities.items():
+            cart[product_id] = cart.get(product_id, 0) + quantity
+
+    async def remove(self, user_id: int, item_id: int, db: AsyncSession) -> bool:
+        return self._carts.get(user_id, {}).pop(item_id, None) is not None
+
+    async def clear(self, user_id: int, db: AsyncSession):
+        for data in (self._carts, self._claims, self._locks):
+            data.pop(user_id, None)
+
+    def _owner(self, user_id: int):
+        token, expires_at = self._locks.get(user_id, (None, 0))
+        if expires_at <= time.monotonic():
+            self._locks.pop(user_id, None)
+            return None
+        return token
+
+    async def _merge_claim(self, user_id: int):
+        claimed = self._claims.pop(user_id, {})
+        if claimed:
+            await self._increment(user_id, claimed)
+
+    async def _quantities(self, user_id: int) -> dict:
+        if self._owner(user_id) is None:
+            await self._merge_claim(user_id)
+        return dict(self._carts.get(user_id, {}))
+
+    async def _claim(self, user_id: int):
+        if self._owner(user_id) is not None:
+            raise HTTPException(status_code=409, detail="Checkout already in progress")
+        await self._merge_claim(user_id)
+        token = uuid.uuid4().hex
+        claimed = self._carts.pop(user_id, {})
+        if claimed:
+            self._claims[user_id] = claimed
+            self._locks[user_id] = (token, time.monotonic() + self.checkout_ttl)
+        return token, dict(claimed)
+
+    async def checkout_confirm(self, user_id: int, token: str):
+        if self._owner(user_id) != token:
+            raise HTTPException(status_code=409, detail="Checkout expired, please try again")
+        self._locks[user_id] = (token, time.monotonic() + self.checkout_ttl)
+
+    def _owns(self, user_id: int, token: str) -> bool:
+        owner = self._owner(user_id)
+        return owner is None or owner == token
+
+    async def checkout_done(self, user_id: int, token: str):
+        if self._owns(user_id, token):
+            self._claims.pop(user_id, None)
+            self._locks.pop(user_id, None)
+
+    async def checkout_failed(self, user_id: int, token: str):
+        if self._owns(user_id, token):
+            await self._merge_claim(user_id)
+            self._locks.pop(user_id, None)
+
+
+def make_cart_store(name: str = CART_BACKEND):
+    if name == "redis":
+        return RedisCartStore()
+    if name == "memory":
+        return MemoryCartStore()
+    return PostgresCartStore()
+
+
+cart_store = make_cart_store()
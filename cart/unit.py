@@ -0,0 +1,39 @@
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from cart.models import Cart
+from product_management.models import Product
+
+
+def merge_items(items) -> dict:
+    # Одинаковые товары в одном запросе складываются: ON CONFLICT
+    # не может обновить одну строку дважды за одну команду
+    quantities = {}
+    for item in items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    return quantities
+
+
+async def check_products_available(product_ids, db: AsyncSession):
+    result = await db.execute(
+        select(Product.c.id).where(Product.c.id.in_(product_ids), Product.c.is_available == True)
+    )
+    missing = set(product_ids) - set(result.scalars().all())
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Products not found or unavailable: {sorted(missing)}"
+        )
+
+
+async def upsert_cart_items(user_id: int, quantities: dict, db: AsyncSession):
+    stmt = insert(Cart).values([
+        {"user_id": user_id, "product_id": product_id, "quantity": quantity}
+        for product_id, quantity in quantities.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_cart_user_id_product_id",
+        set_={"quantity": Cart.c.quantity + stmt.excluded.quantity}
+    )
+    await db.execute(stmt)
\ No newline at end of file
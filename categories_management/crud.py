@@ -1,13 +1,17 @@
 import json
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy import and_, asc, delete, desc, func, or_, select, update
 from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from auth.security import check_admin
 from categories_management.schemas import Categories, CategoriesDeleteResponse, CategoriesResponse, CategoriesUpdate, CategoriesUpdatePatch, CategoriesUpdateResponse, CategoriesUpdateResponsePatch, CategoryCreate, CategoryCreateResponse, QueryParams
-from categories_management.unit import get_category_by_id
+from categories_management.unit import category_query, get_category_by_id
+from cache import catalog_cache, get_catalog, make_key
 from database import get_db
+from http_cache import cache_headers, catalog_etag, is_not_modified
+from serialization import trusted_response
+from pagination import page_cursors
 from categories_management.models import Category
 from product_management.models import Product
 
@@ -34,6 +38,8 @@ async def add_category(
                 detail="Internal Server Error: Could not add new category"
             )
 
+    await catalog_cache.bump_version()
+
     return CategoryCreateResponse(
         status=True,
         new_category=new_category
@@ -41,64 +47,64 @@ async def add_category(
 
 @router.get("/categories", response_model=CategoriesResponse)
 async def categories(
+    request: Request,
+    response: Response,
     query_params: QueryParams = Depends(),
     db: AsyncSession = Depends(get_db)
 ) -> CategoriesResponse:
-    query = select(Category)
-    
-    # Фильтры
-    if query_params.filter:
-        try:
-            filters_dict = json.loads(query_params.filter)
-            filters = [
-                getattr(Category.c, field) == value
-                for field, value in filters_dict.items()
-                if hasattr(Category.c, field)
-            ]
-            if filters:
-                query = query.where(and_(*filters))
-        except json.JSONDecodeError:
-            return JSONResponse(content={"detail": "Invalid filter format. Please provide a valid JSON string."}, status_code=400)
-
-    
-    # Поиск
-    if query_params.search:
-        search_filter = or_(
-            func.lower(Category.c.name).ilike(f"%{query_params.search.lower()}%"),
-            func.lower(Category.c.description).ilike(f"%{query_params.search.lower()}%")
-        )
-        query = query.where(search_filter)
-    
-    # Сортировка
-    if query_params.sort_by and hasattr(Category.c, query_params.sort_by):
-        order_by_column = getattr(Category.c, query_params.sort_by)
-        query = query.order_by(asc(order_by_column) if query_params.order == "asc" else desc(order_by_column))
-    
-    # Пагинация
-    offset = (query_params.page - 1) * query_params.page_size
-    query = query.offset(offset).limit(query_params.page_size)
-
-    result = await db.execute(query)
-    categories_list = [
-        {
-            'id': category.id,
-            'name': category.name,
-            'description': category.description,
-            'is_active': category.is_active
-        } 
-        for category in result.fetchall()
-    ]
-    
-    return CategoriesResponse(data=categories_list)
+    key = f"categories:{make_key(query_params)}"
+    version = await catalog_cache.version()
+    etag = catalog_etag(version, key)
+    headers = cache_headers("categories", etag)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+    query = category_query.apply(select(Category), query_params)
+
+    # Сортировка и пагинация
+    query, sort_column = category_query.paginate(query, query_params)
+
+    async def load():
+        result = await db.execute(query)
+        rows, next_cursor, prev_cursor = page_cursors(result.fetchall(), sort_column, query_params)
+        categories_list = [
+            {
+                'id': category.id,
+                'name': category.name,
+                'description': category.description,
+                'is_active': category.is_active
+            } 
+            for category in rows
+        ]
+        return {"data": categories_list, "next_cursor": next_cursor, "prev_cursor": prev_cursor}
+
+    page = await get_catalog(key, load, version)
+
+    return trusted_response(page, response)
 
 @router.get("/category/{id}", response_model=Categories)
 async def category(
     id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db)
 ) -> Categories:
-    category = await get_category_by_id(id, db)
+    key = f"category:{id}"
+    version = await catalog_cache.version()
+    etag = catalog_etag(version, key)
+    headers = cache_headers("category", etag)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+    async def load():
+        category = await get_category_by_id(id, db)
+        return {'id': category.id, 'name': category.name, 'description': category.description, 'is_active': category.is_active}
+
+    category = await get_catalog(key, load, version)
 
-    return Categories(id=category.id, name=category.name, description=category.description, is_active=category.is_active)
+    return trusted_response(category, response)
 
 @router.put("/category/{id}", response_model=CategoriesUpdateResponse)
 async def update_category_put(
@@ -124,6 +130,8 @@ async def update_category_put(
             detail="Internal Server Error: Could not update category"
         )
 
+    await catalog_cache.bump_version()
+
     return CategoriesUpdateResponse(status=True, data=put_category)
 
 
@@ -164,6 +172,8 @@ async def update_category_patch(
             detail="Internal Server Error: Could not update category"
         )        
 
+    await catalog_cache.bump_version()
+
     return CategoriesUpdateResponsePatch(status=True, data=update_data)
 
 @router.delete("/category/{id}", response_model=CategoriesDeleteResponse)
@@ -189,6 +199,8 @@ async def delete_category(
                 detail="Internal Server Error: Could not delete category"
             )        
 
+    await catalog_cache.bump_version()
+
     return CategoriesDeleteResponse(
         status=True,
         message="Category deleted"
@@ -1,11 +1,14 @@
-from sqlalchemy import MetaData, Table, Column, Integer, String, ForeignKey, Boolean, JSON, Text
+from sqlalchemy import Index, MetaData, Table, Column, Integer, String, ForeignKey, Boolean, JSON, Text
 from models import metadata
 
 Category = Table(
     "category",
     metadata,
     Column("id", Integer, primary_key=True),
-    Column("name", String, nullable=False),
+    Column("name", String, nullable=False, index=True),
     Column("description", Text, nullable=True),
-    Column("is_active", Boolean, nullable=False, default=True),
+    Column("is_active", Boolean, nullable=False, default=True, index=True),
+    # Триграммные индексы для поиска ILIKE '%...%' (расширение pg_trgm)
+    Index("ix_category_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    Index("ix_category_description_trgm", "description", postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}),
 )
\ No newline at end of file
@@ -1,6 +1,7 @@
 from typing import Dict, List, Optional
 from fastapi import Query
 from pydantic import BaseModel
+from query_engine import ListQueryParams
 
 class CategoryCreate(BaseModel):
     name: str
@@ -19,6 +20,8 @@ class Categories(BaseModel):
 
 class CategoriesResponse(BaseModel):
     data: List[Categories]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 class CategoriesUpdate(BaseModel):
     name: str
@@ -50,10 +53,5 @@ class OrderItem(BaseModel):
     quantity: int
     price: float
 
-class QueryParams(BaseModel):
-    sort_by: Optional[str] = None  # Поле для сортировки
-    order: Optional[str] = "asc"  # Порядок сортировки: asc (по возрастанию) или desc (по убыванию)
-    search: Optional[str] = None  # Поиск по тексту
-    filter: Optional[str] = None
-    page: int = 1  # Номер страницы
-    page_size: int = 10  # Количество записей на странице
\ No newline at end of file
+class QueryParams(ListQueryParams):
+    pass
\ No newline at end of file
@@ -2,6 +2,7 @@ from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from categories_management.models import Category
+from query_engine import QueryEngine
 
 
 async def get_category_by_id(id: int, db: AsyncSession):
@@ -9,4 +10,12 @@ async def get_category_by_id(id: int, db: AsyncSession):
     category = result.fetchone()
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
-    return category
\ No newline at end of file
+    return category
+
+
+category_query = QueryEngine(
+    Category,
+    search=("name", "description"),
+    filterable=("id", "name", "is_active"),
+    sortable=("name",)
+)
\ No newline at end of file
@@ -4,10 +4,21 @@ app = Celery('tasks', broker='redis://redis:6379/0')
 app.conf.result_backend = 'redis://redis:6379/0'
 
 import tasks
+from config import ANALYTICS_USE_MATVIEW, ANALYTICS_REFRESH_SECONDS
 
 app.conf.beat_schedule = {
     'delete-unverified-users-daily': {
         'task': 'tasks.delete_unverified_users',
         'schedule': 60 * 60 * 24,  # каждый день (каждые 24 часа)
     },
+    'send-outbox-emails': {
+        'task': 'tasks.send_outbox_emails',
+        'schedule': 60,  # страховка, если постановка задачи после заказа не удалась
+    },
 }
+
+if ANALYTICS_USE_MATVIEW:
+    app.conf.beat_schedule['refresh-order-daily-revenue'] = {
+        'task': 'tasks.refresh_order_daily_revenue',
+        'schedule': ANALYTICS_REFRESH_SECONDS,
+    }
\ No newline at end of file
@@ -12,3 +12,115 @@ SECRET = os.environ.get("SECRET")
 ALGORITHM = os.environ.get("ALGORITHM")
 sender_email = os.environ.get("sender_email")
 sender_password = os.environ.get("sender_password")
+
+# SMTP; для локальной заглушки: python -m aiosmtpd -n -l localhost:1025,
+# SMTP_HOST=localhost SMTP_PORT=1025 SMTP_START_TLS=false
+SMTP_HOST = os.environ.get("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.environ.get("SMTP_PORT", 587))
+SMTP_START_TLS = os.environ.get("SMTP_START_TLS", "true").lower() == "true"
+SMTP_TIMEOUT = float(os.environ.get("SMTP_TIMEOUT", 10))
+# Пул постоянных соединений (mailer.py)
+SMTP_POOL_SIZE = int(os.environ.get("SMTP_POOL_SIZE", 4))
+SMTP_IDLE_TIMEOUT = float(os.environ.get("SMTP_IDLE_TIMEOUT", 60))
+SMTP_RETRIES = int(os.environ.get("SMTP_RETRIES", 3))
+SMTP_RETRY_BACKOFF = float(os.environ.get("SMTP_RETRY_BACKOFF", 0.5))
+
+# Пул соединений с БД. Каждый воркер gunicorn создаёт свой пул, поэтому
+# при заданном DB_MAX_CONNECTIONS (на все воркеры) пул по умолчанию
+# делится между WEB_CONCURRENCY воркерами (выставляется в gunicorn.conf.py).
+# Если воркеров больше, чем соединений, лимит превышается (по одному
+# соединению на воркер) — об этом предупреждает lifespan в main.py
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", 1))
+DB_MAX_CONNECTIONS = int(os.environ.get("DB_MAX_CONNECTIONS", 0))  # 0 — без общего лимита
+_worker_connections = max(1, DB_MAX_CONNECTIONS // WEB_CONCURRENCY) if DB_MAX_CONNECTIONS else 15
+# pool_size=0 в SQLAlchemy означает пул без ограничения, поэтому минимум 1
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", max(1, min(5, _worker_connections // 2))))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", max(0, _worker_connections - DB_POOL_SIZE)))
+DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", 30))  # секунды ожидания свободного соединения
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))  # секунды жизни соединения
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 5000))  # 0 — без ограничения
+DB_POOL_WARMUP = int(os.environ.get("DB_POOL_WARMUP", DB_POOL_SIZE))  # соединений, открываемых при старте
+# Кеш скомпилированных запросов SQLAlchemy и подготовленных выражений asyncpg
+# (на соединение); списки с разными фильтрами дают много форм запросов
+DB_QUERY_CACHE_SIZE = int(os.environ.get("DB_QUERY_CACHE_SIZE", 1000))
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_PREPARED_STATEMENT_CACHE_SIZE", 500))
+
+REDIS_URL = os.environ.get("REDIS_URL", "redis://redis:6379/0")
+# memory или redis. Кеш в памяти у каждого воркера свой (версия каталога,
+# роли), поэтому при нескольких воркерах по умолчанию redis, а memory
+# не даёт приложению стартовать (main.py)
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "redis" if WEB_CONCURRENCY > 1 else "memory")
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", 10000))
+ROLE_CACHE_TTL = int(os.environ.get("ROLE_CACHE_TTL", 60))  # секунды
+# Потоков bcrypt на воркер: ядра делятся между WEB_CONCURRENCY воркерами
+PASSWORD_HASH_CONCURRENCY = int(os.environ.get("PASSWORD_HASH_CONCURRENCY", max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)))
+CATALOG_CACHE_TTL = int(os.environ.get("CATALOG_CACHE_TTL", 300))  # секунды
+USER_INFO_CACHE_TTL = int(os.environ.get("USER_INFO_CACHE_TTL", 30))  # секунды, 0 — без кеша
+
+# Ранжирование поиска товаров: trgm (word_similarity из pg_trgm) или memory —
+# триграммный индекс в памяти процесса (search_index.py) для тестов и баз без pg_trgm
+SEARCH_BACKEND = os.environ.get("SEARCH_BACKEND", "trgm")
+
+# Отдавать строки из БД без повторной валидации через response_model
+TRUSTED_RESPONSES = os.environ.get("TRUSTED_RESPONSES", "true").lower() == "true"
+
+# Политики Cache-Control для GET-эндпоинтов каталога
+CACHE_CONTROL = {
+    "products": os.environ.get("CACHE_CONTROL_PRODUCTS", "public, no-cache"),
+    "product": os.environ.get("CACHE_CONTROL_PRODUCT", "public, no-cache"),
+    "categories": os.environ.get("CACHE_CONTROL_CATEGORIES", "public, no-cache"),
+    "category": os.environ.get("CACHE_CONTROL_CATEGORY", "public, no-cache"),
+}
+
+# Очистка неверифицированных пользователей (Celery)
+CLEANUP_BATCH_SIZE = int(os.environ.get("CLEANUP_BATCH_SIZE", 1000))
+UNVERIFIED_USER_TTL_HOURS = int(os.environ.get("UNVERIFIED_USER_TTL_HOURS", 24))
+
+# Хранилище корзины: postgres, redis или memory (для тестов)
+CART_BACKEND = os.environ.get("CART_BACKEND", "postgres")
+CART_TTL_DAYS = int(os.environ.get("CART_TTL_DAYS", 30))  # срок жизни корзины в Redis
+# Секунды, на которые оформление заказа блокирует забранную корзину; после
+# них незавершённое оформление (упавший процесс) возвращается в корзину
+CART_CHECKOUT_TTL = int(os.environ.get("CART_CHECKOUT_TTL", 300))
+CART_BATCH_MAX_ITEMS = int(os.environ.get("CART_BATCH_MAX_ITEMS", 100))  # строк в одном POST /cart/cart/batch
+
+
+# Outbox писем о заказах (Celery)
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", 100))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 5))
+# Повтор после ошибки через OUTBOX_RETRY_BASE_SECONDS * 2^(попытка - 1),
+# но не позже чем через OUTBOX_RETRY_MAX_SECONDS
+OUTBOX_RETRY_BASE_SECONDS = int(os.environ.get("OUTBOX_RETRY_BASE_SECONDS", 60))
+OUTBOX_RETRY_MAX_SECONDS = int(os.environ.get("OUTBOX_RETRY_MAX_SECONDS", 3600))
+
+
+# Аналитика заказов: читать выручку по дням из материализованного
+# представления order_daily_revenue вместо агрегации по order
+ANALYTICS_USE_MATVIEW = os.environ.get("ANALYTICS_USE_MATVIEW", "false").lower() == "true"
+ANALYTICS_REFRESH_SECONDS = int(os.environ.get("ANALYTICS_REFRESH_SECONDS", 300))
+
+
+# Потоковая выгрузка (export.py): строк за одну выборку из курсора
+# и лимит времени запроса выгрузки (0 — без ограничения)
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 1000))
+EXPORT_STATEMENT_TIMEOUT_MS = int(os.environ.get("EXPORT_STATEMENT_TIMEOUT_MS", 600000))
+
+
+# Массовый импорт товаров: максимум строк в одном запросе
+PRODUCT_IMPORT_MAX_ROWS = int(os.environ.get("PRODUCT_IMPORT_MAX_ROWS", 10000))
+
+
+# Инструментирование запросов (monitoring/instrumentation.py)
+SLOW_QUERY_MS = int(os.environ.get("SLOW_QUERY_MS", 200))  # 0 — не логировать
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "false").lower() == "true"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")  # Bearer-токен для /monitoring/metrics
+# Бюджеты запросов к БД и времени ответа (monitoring/budgets.py): off или warn
+QUERY_BUDGETS = os.environ.get("QUERY_BUDGETS", "warn")
+
+
+# Старт веб-процесса: целевое время холодного старта (от импорта main до
+# готовности) и разовая очистка неверифицированных пользователей (обычно
+# её выполняет Celery beat по расписанию)
+STARTUP_TARGET_MS = int(os.environ.get("STARTUP_TARGET_MS", 2000))
+CLEANUP_ON_STARTUP = os.environ.get("CLEANUP_ON_STARTUP", "false").lower() == "true"
@@ -1,15 +1,104 @@
+import asyncio
+import logging
+import time
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession
-from config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from config import (
+    DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER,
+    DB_MAX_OVERFLOW, DB_POOL_PRE_PING, DB_POOL_WARMUP, DB_PREPARED_STATEMENT_CACHE_SIZE, DB_QUERY_CACHE_SIZE, DB_POOL_RECYCLE, DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_STATEMENT_TIMEOUT_MS,
+)
+from monitoring.instrumentation import instrument_engine
+from monitoring.metrics import Histogram, render_gauge, render_histogram
+
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_async_engine(DATABASE_URL, echo=False)
+# Время ожидания соединения из пула (включая открытие нового соединения)
+pool_wait = Histogram()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait.observe(time.perf_counter() - started)
+
+
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=False,
+    poolclass=InstrumentedPool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    query_cache_size=DB_QUERY_CACHE_SIZE,
+    # statement_timeout задаётся на соединение и ограничивает каждый запрос
+    connect_args={
+        "server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)},
+        "prepared_statement_cache_size": DB_PREPARED_STATEMENT_CACHE_SIZE,
+    },
+)
+# Счётчики запросов и медленные запросы (monitoring/instrumentation.py)
+instrument_engine(engine.sync_engine)
+
 async_session = sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
 
+async def warm_up_pool(size: int = DB_POOL_WARMUP):
+    # Открываем соединения заранее, чтобы первые запросы не ждали
+    # подключения и инициализации диалекта. Соединения держатся
+    # одновременно, иначе пул отдавал бы одно и то же. Больше
+    # pool_size + max_overflow пул не выдаст: лишние ждали бы pool_timeout
+    size = min(size, DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    if size <= 0:
+        return 0
+
+    connections = await asyncio.gather(
+        *(engine.connect().start() for _ in range(size)),
+        return_exceptions=True
+    )
+    opened = [connection for connection in connections if not isinstance(connection, BaseException)]
+    try:
+        await asyncio.gather(*(connection.execute(text("SELECT 1")) for connection in opened))
+    finally:
+        await asyncio.gather(*(connection.close() for connection in opened))
+
+    errors = [connection for connection in connections if isinstance(connection, BaseException)]
+    if errors:
+        logger.error("Pool warm-up: %d of %d connections failed", len(errors), size, exc_info=errors[0])
+    return len(opened)
+
+
 async def get_db():
     async with async_session() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+def pool_stats() -> dict:
+    pool = engine.sync_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "wait_seconds": pool_wait.snapshot(),
+    }
+
+
+def pool_prometheus_lines() -> list:
+    stats = pool_stats()
+    lines = ["# TYPE db_pool_connections gauge"]
+    for state in ("checked_in", "checked_out", "overflow"):
+        lines.append(render_gauge("db_pool_connections", stats[state], {"state": state}))
+    lines.append("# TYPE db_pool_wait_seconds histogram")
+    lines += render_histogram("db_pool_wait_seconds", pool_wait)
+    return lines
\ No newline at end of file
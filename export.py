@@ -0,0 +1,62 @@
+import csv
+import io
+import logging
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
+from config import EXPORT_CHUNK_SIZE, EXPORT_STATEMENT_TIMEOUT_MS
+from database import async_session
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def encode_csv(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def encode_ndjson(columns: list, rows) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+async def export_rows(query, export_format: str):
+    """
+    Построчная выгрузка результата запроса через серверный курсор.
+
+    В памяти одновременно держится не больше EXPORT_CHUNK_SIZE строк.
+    Сессия открывается здесь же: сессия из get_db закрывается раньше,
+    чем StreamingResponse начинает отдавать тело.
+    """
+    columns = [column.key for column in query.selected_columns]
+    if export_format == "csv":
+        yield encode_csv([columns])
+
+    try:
+        async with async_session() as session:
+            async with session.begin():
+                # Выгрузка дольше обычного запроса, лимит задаётся отдельно
+                await session.execute(text(f"SET LOCAL statement_timeout = {int(EXPORT_STATEMENT_TIMEOUT_MS)}"))
+                result = await session.stream(query.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+                async for rows in result.partitions():
+                    if export_format == "csv":
+                        yield encode_csv(rows)
+                    else:
+                        yield encode_ndjson(columns, rows)
+    except Exception:
+        # Заголовки уже отправлены, поэтому остаётся оборвать ответ
+        logger.exception("Export failed")
+        raise
+
+
+def stream_export(query, name: str, export_format: str) -> StreamingResponse:
+    return StreamingResponse(
+        export_rows(query, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format}"'}
+    )
\ No newline at end of file
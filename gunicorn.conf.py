@@ -0,0 +1,29 @@
+# Продакшен-запуск: gunicorn -c gunicorn.conf.py main:app
+#
+# Воркеры uvicorn с uvloop и httptools (loop и http в режиме auto выбирают
+# их, если пакеты установлены). Плавный перезапуск воркеров без потери
+# соединений: kill -HUP <pid мастера>.
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Асинхронному воркеру достаточно одного процесса на ядро
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Число воркеров нужно config.py для деления DB_MAX_CONNECTIONS на пулы.
+# Приложение импортируется в каждом воркере после fork (preload_app
+# выключен), поэтому пулы БД, Redis и SMTP у каждого воркера свои
+os.environ["WEB_CONCURRENCY"] = str(workers)
+preload_app = False
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+# Периодический перезапуск воркеров ограничивает рост памяти
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 1000))
+
+accesslog = os.environ.get("GUNICORN_ACCESSLOG", "-")
\ No newline at end of file
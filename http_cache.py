@@ -0,0 +1,33 @@
+import hashlib
+import uuid
+from fastapi import Request
+from config import CACHE_BACKEND, CACHE_CONTROL
+
+# Версия каталога в кеше процесса (CACHE_BACKEND=memory) начинается с 0 при
+# каждом старте. Метка запуска не даёт ETag до и после рестарта совпасть,
+# иначе клиент получил бы 304 на изменившиеся данные. Версия в Redis общая
+# и переживает рестарт, метка не нужна
+BOOT_ID = None if CACHE_BACKEND == "redis" else uuid.uuid4().hex[:8]
+
+
+def catalog_etag(version: int, key: str) -> str:
+    # Сильный ETag: [метка запуска] + версия каталога + хеш нормализованного запроса
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    if BOOT_ID:
+        return f'"{BOOT_ID}-{version}-{digest}"'
+    return f'"{version}-{digest}"'
+
+
+def cache_headers(route: str, etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL[route]}
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Для If-None-Match используется слабое сравнение (RFC 9110)
+    candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return etag in candidates
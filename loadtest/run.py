@@ -0,0 +1,359 @@
+"""
+Нагрузочный тест: виртуальные покупатели и администраторы на httpx + asyncio.
+
+    python -m loadtest.seed
+    python -m loadtest.run --base-url http://localhost:8000 --duration 60 --concurrency 50 \
+        --output report.json --baseline previous.json
+
+Покупатель ищет и смотрит товары, кладёт их в корзину, оформляет заказ
+и открывает страницу аккаунта; администратор листает заказы и смотрит
+аналитику (--scenario mixed). Отдельные сценарии нагружают один участок:
+
+    deep-pages  — первая и глубокая страница заказов по OFFSET и по курсору
+    login-storm — непрерывные входы рядом с анонимным просмотром каталога
+    large-pages — страницы каталога по 500 товаров (сериализация ответа)
+    cart        — частые изменения корзины; прогоны сервера с CART_BACKEND=postgres
+                  и redis сравниваются через --baseline
+
+По каждому эндпоинту выводятся запросы в секунду,
+p50/p95/p99 и доля ошибок. Отчёт в JSON (--output) можно сравнить
+со снятым на другом коммите (--baseline).
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+import httpx
+from loadtest.seed import ADMIN_EMAIL, WORDS, user_email
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, name: str, elapsed: float, ok: bool):
+        self.latencies.setdefault(name, []).append(elapsed)
+        if not ok:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def report(self, duration: float) -> dict:
+        endpoints = {}
+        for name, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            endpoints[name] = {
+                "requests": len(values),
+                "rps": len(values) / duration,
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "error_rate": self.errors.get(name, 0) / len(values),
+            }
+        total = sum(len(values) for values in self.latencies.values())
+        return {
+            "commit": git_commit(),
+            "duration_s": duration,
+            "requests": total,
+            "rps": total / duration,
+            "error_rate": sum(self.errors.values()) / total if total else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+def percentile(values: list, p: float) -> float:
+    # Ближайший ранг по отсортированному списку
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, round(p / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+class VirtualUser:
+    needs_login = True
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, email: str, password: str):
+        self.client = client
+        self.recorder = recorder
+        self.email = email
+        self.password = password
+        self.headers = {}
+
+    async def call(self, name: str, method: str, url: str, **kwargs):
+        # name — шаблон эндпоинта, чтобы /product/product/1 и /2 шли в одну строку отчёта
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+            ok = response.status_code < 400 or response.status_code == 304
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.recorder.record(name, time.perf_counter() - started, ok)
+        return response
+
+    async def login(self) -> bool:
+        response = await self.call(
+            "POST /auth/authentication", "POST", "/auth/authentication",
+            json={"email": self.email, "password": self.password}
+        )
+        if response is None or response.status_code != 200:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+
+class Shopper(VirtualUser):
+    async def browse(self) -> list:
+        response = await self.call(
+            "GET /product/products?search", "GET", "/product/products",
+            params={"search": random.choice(WORDS), "page_size": 20}
+        )
+        products = response.json().get("data", []) if response is not None and response.status_code == 200 else []
+        for product in random.sample(products, min(len(products), 2)):
+            await self.call("GET /product/product/{id}", "GET", f"/product/product/{product['id']}")
+        return [product["id"] for product in products if product["is_available"]]
+
+    async def step(self):
+        product_ids = await self.browse()
+        roll = random.random()
+
+        if product_ids and roll < 0.5:
+            for product_id in random.sample(product_ids, min(len(product_ids), random.randint(1, 3))):
+                await self.call(
+                    "POST /cart/cart", "POST", "/cart/cart",
+                    json={"product_id": product_id, "quantity": random.randint(1, 3)}
+                )
+            # Примерно каждая третья корзина оформляется в заказ
+            if random.random() < 0.35:
+                await self.call("POST /order/order", "POST", "/order/order")
+        elif roll < 0.7:
+            await self.call("POST /user/me", "POST", "/user/me")
+
+
+class Admin(VirtualUser):
+    async def step(self):
+        roll = random.random()
+        if roll < 0.6:
+            await self.call(
+                "GET /order/orders", "GET", "/order/orders",
+                params={"sort_by": "created_at", "order": "desc", "page_size": 50}
+            )
+        elif roll < 0.8:
+            await self.call("GET /order/orders/analytics/revenue", "GET", "/order/orders/analytics/revenue")
+        else:
+            await self.call(
+                "GET /order/orders/analytics/top-products", "GET", "/order/orders/analytics/top-products",
+                params={"limit": 10}
+            )
+
+
+class DeepPages(VirtualUser):
+    """
+    Администратор листает заказы: первая страница, страница --deep-page по
+    OFFSET и следующая за ней по курсору after. Для страницы 10 000 при
+    page_size=10 нужно больше 100 000 заказов (loadtest.seed --orders).
+    """
+
+    def __init__(self, *args, deep_page: int):
+        super().__init__(*args)
+        self.deep_page = deep_page
+        self.cursor = None
+
+    async def step(self):
+        params = {"sort_by": "created_at", "order": "desc", "page_size": 10}
+        await self.call("GET /order/orders page=1", "GET", "/order/orders", params=params)
+        response = await self.call(
+            f"GET /order/orders page={self.deep_page} (offset)", "GET", "/order/orders",
+            params={**params, "page": self.deep_page}
+        )
+        if self.cursor is None and response is not None and response.status_code == 200:
+            self.cursor = response.json().get("next_cursor")
+        if self.cursor:
+            await self.call(
+                f"GET /order/orders page={self.deep_page + 1} (cursor)", "GET", "/order/orders",
+                params={**params, "after": self.cursor}
+            )
+
+
+class LoginStorm(VirtualUser):
+    """Только входы: bcrypt на каждом шаге."""
+
+    needs_login = False
+
+    async def step(self):
+        await self.login()
+
+
+class Browser(Shopper):
+    """Анонимный просмотр каталога: эндпоинты без хеширования паролей."""
+
+    needs_login = False
+
+    async def step(self):
+        await self.browse()
+
+
+class LargePages(VirtualUser):
+    """Страницы каталога по 500 товаров: стоимость сериализации ответа."""
+
+    needs_login = False
+
+    async def step(self):
+        await self.call(
+            "GET /product/products?page_size=500", "GET", "/product/products",
+            params={"page_size": 500, "page": random.randint(1, 4), "sort_by": random.choice(["name", "price"])}
+        )
+
+
+class CartChurn(VirtualUser):
+    """
+    Покупатель меняет корзину: добавляет товары по одному и пачкой, смотрит
+    корзину на странице аккаунта, очищает её и изредка оформляет заказ.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.product_ids = None
+
+    async def step(self):
+        if self.product_ids is None:
+            response = await self.call(
+                "GET /product/products", "GET", "/product/products",
+                params={"page_size": 100, "filter": '{"is_available": true}'}
+            )
+            data = response.json().get("data", []) if response is not None and response.status_code == 200 else []
+            self.product_ids = [product["id"] for product in data]
+        if not self.product_ids:
+            return
+
+        for product_id in random.sample(self.product_ids, min(len(self.product_ids), 3)):
+            await self.call("POST /cart/cart", "POST", "/cart/cart", json={"product_id": product_id, "quantity": 1})
+        items = [
+            {"product_id": product_id, "quantity": random.randint(1, 3)}
+            for product_id in random.sample(self.product_ids, min(len(self.product_ids), 5))
+        ]
+        await self.call("POST /cart/cart/batch", "POST", "/cart/cart/batch", json={"items": items})
+        await self.call("POST /user/me", "POST", "/user/me")
+
+        if random.random() < 0.1:
+            await self.call("POST /order/order", "POST", "/order/order")
+        else:
+            await self.call("DELETE /cart/cart", "DELETE", "/cart/cart")
+
+
+def mixed_users(client, recorder, args) -> list:
+    admins = max(1, round(args.concurrency * args.admin_share)) if args.admin_share else 0
+    users = [Admin(client, recorder, ADMIN_EMAIL, args.password) for _ in range(admins)]
+    users += [
+        Shopper(client, recorder, user_email(random.randint(1, args.users)), args.password)
+        for _ in range(args.concurrency - admins)
+    ]
+    return users
+
+
+def deep_page_users(client, recorder, args) -> list:
+    return [DeepPages(client, recorder, ADMIN_EMAIL, args.password, deep_page=args.deep_page) for _ in range(args.concurrency)]
+
+
+def login_storm_users(client, recorder, args) -> list:
+    # С --login-share 0 — та же нагрузка на каталог без входов, для сравнения
+    logins = round(args.concurrency * args.login_share)
+    users = [LoginStorm(client, recorder, user_email(random.randint(1, args.users)), args.password) for _ in range(logins)]
+    users += [Browser(client, recorder, None, None) for _ in range(args.concurrency - logins)]
+    return users
+
+
+def large_page_users(client, recorder, args) -> list:
+    return [LargePages(client, recorder, None, None) for _ in range(args.concurrency)]
+
+
+def cart_users(client, recorder, args) -> list:
+    return [
+        CartChurn(client, recorder, user_email(random.randint(1, args.users)), args.password)
+        for _ in range(args.concurrency)
+    ]
+
+
+# Сценарии (--scenario): функция создаёт виртуальных пользователей
+SCENARIOS = {
+    "mixed": mixed_users,
+    "deep-pages": deep_page_users,
+    "login-storm": login_storm_users,
+    "large-pages": large_page_users,
+    "cart": cart_users,
+}
+
+
+async def run_user(user: VirtualUser, deadline: float, think_time: float):
+    if user.needs_login and not await user.login():
+        return
+    while time.perf_counter() < deadline:
+        await user.step()
+        if think_time:
+            await asyncio.sleep(random.uniform(0, 2 * think_time))
+
+
+async def run(args) -> dict:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        users = SCENARIOS[args.scenario](client, recorder, args)
+
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(run_user(user, deadline, args.think_time) for user in users))
+        return recorder.report(time.perf_counter() - started)
+
+
+def print_report(report: dict, baseline: dict = None):
+    print(f"commit {report['commit']}: {report['requests']} requests, {report['rps']:.1f} rps, "
+          f"errors {report['error_rate']:.2%}")
+    print(f"{'endpoint':45} {'reqs':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, stats in report["endpoints"].items():
+        line = (f"{name:45} {stats['requests']:>7} {stats['rps']:>8.1f} {stats['p50_ms']:>8.1f} "
+                f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['error_rate']:>7.2%}")
+        previous = (baseline or {}).get("endpoints", {}).get(name)
+        if previous:
+            line += f"   p95 {stats['p95_ms'] - previous['p95_ms']:+.1f} ms, rps {stats['rps'] - previous['rps']:+.1f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test with shopper and admin scenarios")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--concurrency", type=int, default=50, help="virtual users")
+    parser.add_argument("--admin-share", type=float, default=0.05, help="share of virtual users that are admins")
+    parser.add_argument("--users", type=int, default=200, help="number of seeded shoppers to log in as")
+    parser.add_argument("--password", default="loadtest")
+    parser.add_argument("--think-time", type=float, default=0.5, help="mean pause between steps, seconds")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--deep-page", type=int, default=10000, help="page number for the deep-pages scenario")
+    parser.add_argument("--login-share", type=float, default=0.5, help="share of virtual users that only log in (login-storm)")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report from another commit to compare with")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Наполнение базы данными для нагрузочного теста.
+
+    python -m loadtest.seed --categories 20 --products 2000 --users 200 --orders 5000
+
+Создаёт администратора loadtest-admin@example.com и пользователей
+loadtest-user-{n}@example.com с паролем --password (все верифицированы),
+категории, товары с названиями из WORDS и заказы за последние 90 дней.
+Повторный запуск добавляет новые категории, товары и заказы, а
+существующих пользователей оставляет как есть.
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from auth.models import Role, User
+from auth.unit import get_password_hash
+from categories_management.models import Category
+from database import async_session, engine
+from order_management.models import Order, OrderItems
+from product_management.models import Product
+
+# Слова для названий товаров; из них же нагрузочный тест берёт поисковые запросы
+WORDS = [
+    "espresso", "latte", "cappuccino", "americano", "mocha", "arabica", "robusta",
+    "colombia", "ethiopia", "kenya", "brazil", "decaf", "blend", "single", "origin",
+    "grinder", "kettle", "filter", "press", "cup", "mug", "syrup", "vanilla", "caramel",
+]
+STATUSES = ["Ожидает", "Оплачен", "Отправлен", "Доставлен", "Отменён"]
+ADMIN_EMAIL = "loadtest-admin@example.com"
+
+
+def user_email(number: int) -> str:
+    return f"loadtest-user-{number}@example.com"
+
+
+async def seed(categories: int, products: int, users: int, orders: int, password: str):
+    started = time.perf_counter()
+    # Один хеш на всех: bcrypt на каждого пользователя занял бы минуты
+    hashed_password = await get_password_hash(password)
+
+    async with async_session() as db:
+        async with db.begin():
+            await db.execute(
+                insert(Role).on_conflict_do_nothing(index_elements=["id"]),
+                [{"id": 1, "name": "user"}, {"id": 2, "name": "admin"}]
+            )
+
+            accounts = [{"email": ADMIN_EMAIL, "role_id": 2, "username": "loadtest-admin"}] + [
+                {"email": user_email(number), "role_id": 1, "username": f"loadtest-user-{number}"}
+                for number in range(1, users + 1)
+            ]
+            await db.execute(
+                insert(User).on_conflict_do_nothing(index_elements=["email"]),
+                [{**account, "hashed_password": hashed_password, "is_verified": True} for account in accounts]
+            )
+            result = await db.execute(
+                select(User.c.id).where(User.c.email.in_([user_email(number) for number in range(1, users + 1)]))
+            )
+            user_ids = result.scalars().all()
+
+            result = await db.execute(
+                insert(Category).returning(Category.c.id),
+                [
+                    {"name": f"{random.choice(WORDS).title()} {number}", "description": " ".join(random.sample(WORDS, 5)), "is_active": True}
+                    for number in range(1, categories + 1)
+                ]
+            )
+            category_ids = result.scalars().all()
+
+            result = await db.execute(
+                insert(Product).returning(Product.c.id, Product.c.price),
+                [
+                    {
+                        "name": " ".join(random.sample(WORDS, 2)).title() + f" {number}",
+                        "price": random.randint(100, 5000),
+                        "description": " ".join(random.sample(WORDS, 8)),
+                        "category_id": random.choice(category_ids),
+                        "is_available": random.random() > 0.05,
+                    }
+                    for number in range(1, products + 1)
+                ]
+            )
+            prices = dict(result.fetchall())
+
+            now = datetime.now(timezone.utc)
+            baskets = []
+            for _ in range(orders):
+                lines = {product_id: random.randint(1, 3) for product_id in random.sample(list(prices), random.randint(1, 5))}
+                baskets.append(lines)
+
+            # Порядок id совпадает с порядком корзин (нужно для строк заказа)
+            result = await db.execute(
+                insert(Order).returning(Order.c.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "user_id": random.choice(user_ids),
+                        "total_price": sum(prices[product_id] * quantity for product_id, quantity in lines.items()),
+                        "status": random.choice(STATUSES),
+                        "created_at": now - timedelta(seconds=random.randint(0, 90 * 24 * 3600)),
+                    }
+                    for lines in baskets
+                ],
+            )
+            order_ids = result.scalars().all()
+
+            await db.execute(
+                insert(OrderItems),
+                [
+                    {"order_id": order_id, "product_id": product_id, "quantity": quantity, "price": prices[product_id]}
+                    for order_id, lines in zip(order_ids, baskets)
+                    for product_id, quantity in lines.items()
+                ]
+            )
+
+    await engine.dispose()
+    print(
+        f"Seeded {len(category_ids)} categories, {len(prices)} products, {len(user_ids)} users, "
+        f"{len(order_ids)} orders in {time.perf_counter() - started:.1f} s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the database for load testing")
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--password", default="loadtest")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible data")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    asyncio.run(seed(args.categories, args.products, args.users, args.orders, args.password))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import time
+import aiosmtplib
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from config import (
+    sender_email, sender_password, SMTP_HOST, SMTP_PORT, SMTP_START_TLS, SMTP_TIMEOUT,
+    SMTP_POOL_SIZE, SMTP_IDLE_TIMEOUT, SMTP_RETRIES, SMTP_RETRY_BACKOFF
+)
+from monitoring.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+def build_message(recipient_email: str, subject: str, body_text: str) -> MIMEMultipart:
+    msg = MIMEMultipart()
+    msg['From'] = sender_email
+    msg['To'] = recipient_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body_text, 'plain'))
+    return msg
+
+
+def is_permanent(error: Exception) -> bool:
+    # 5xx и отказ получателей повторять бессмысленно
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, aiosmtplib.SMTPResponseException) and 500 <= error.code < 600
+
+
+class SMTPPool:
+    """
+    Пул постоянных SMTP-соединений.
+
+    Соединение (TCP, STARTTLS, логин) открывается один раз и
+    переиспользуется, пока не простоит дольше idle_timeout. Число
+    одновременных отправок ограничено size; временные ошибки
+    повторяются с экспоненциальной задержкой на новом соединении.
+    """
+
+    def __init__(
+        self,
+        size: int = SMTP_POOL_SIZE,
+        idle_timeout: float = SMTP_IDLE_TIMEOUT,
+        retries: int = SMTP_RETRIES,
+        backoff: float = SMTP_RETRY_BACKOFF,
+        hostname: str = SMTP_HOST,
+        port: int = SMTP_PORT,
+        start_tls: bool = SMTP_START_TLS
+    ):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.hostname = hostname
+        self.port = port
+        self.start_tls = start_tls
+        self._idle = []
+        self._semaphore = None
+        self.send_seconds = Histogram()
+        self.counters = {"sent": 0, "failed": 0, "retries": 0, "connects": 0, "reused": 0}
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Создаётся в цикле событий, где пул используется впервые
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.size)
+        return self._semaphore
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            start_tls=self.start_tls,
+            timeout=SMTP_TIMEOUT
+        )
+        await smtp.connect()
+        # Локальная заглушка SMTP обычно не поддерживает AUTH
+        if sender_password and smtp.supports_extension("auth"):
+            await smtp.login(sender_email, sender_password)
+        self.counters["connects"] += 1
+        return smtp
+
+    async def _acquire(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            smtp, released_at = self._idle.pop()
+            if smtp.is_connected and time.monotonic() - released_at < self.idle_timeout:
+                self.counters["reused"] += 1
+                return smtp
+            await self._discard(smtp)
+        return await self._connect()
+
+    def _release(self, smtp: aiosmtplib.SMTP):
+        self._idle.append((smtp, time.monotonic()))
+
+    async def _discard(self, smtp: aiosmtplib.SMTP):
+        try:
+            if smtp.is_connected:
+                await smtp.quit()
+        except Exception:
+            smtp.close()
+
+    async def send(self, msg):
+        async with self.semaphore:
+            start = time.perf_counter()
+            attempt = 0
+            while True:
+                smtp = None
+                try:
+                    smtp = await self._acquire()
+                    await smtp.send_message(msg)
+                    self._release(smtp)
+                    self.counters["sent"] += 1
+                    self.send_seconds.observe(time.perf_counter() - start)
+                    return
+                except Exception as e:
+                    if smtp is not None:
+                        if isinstance(e, aiosmtplib.SMTPRecipientsRefused):
+                            # Соединение исправно, отказал только адресат
+                            self._release(smtp)
+                        else:
+                            await self._discard(smtp)
+
+                    if is_permanent(e) or attempt >= self.retries:
+                        self.counters["failed"] += 1
+                        raise
+                    self.counters["retries"] += 1
+                    await asyncio.sleep(self.backoff * 2 ** attempt)
+                    attempt += 1
+
+    async def send_batch(self, messages: list) -> list:
+        """Отправляет письма; возвращает по каждому None при успехе или исключение."""
+        async def send_one(msg):
+            try:
+                await self.send(msg)
+            except Exception as e:
+                logger.exception("Failed to send email to %s", msg["To"])
+                return e
+            return None
+
+        return await asyncio.gather(*(send_one(msg) for msg in messages))
+
+    async def close(self):
+        while self._idle:
+            smtp, _ = self._idle.pop()
+            await self._discard(smtp)
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "idle": len(self._idle),
+            "send_seconds": self.send_seconds.snapshot(),
+        }
+
+
+# Общий пул процесса API
+mailer = SMTPPool()
+
+
+async def send_mail(recipient_email: str, subject: str, body_text: str) -> bool:
+    try:
+        await mailer.send(build_message(recipient_email, subject, body_text))
+        return True
+    except Exception:
+        logger.exception("Failed to send email to %s", recipient_email)
+        return False
+
+
+async def send_batch(messages: list) -> list:
+    # Для разовых запусков в отдельном цикле событий (задачи Celery):
+    # пул живёт, пока отправляется пачка
+    pool = SMTPPool()
+    try:
+        return await pool.send_batch(messages)
+    finally:
+        await pool.close()
\ No newline at end of file
@@ -1,5 +1,13 @@
+import time
+
+# Отсчёт холодного старта: от импорта main до готовности приложения
+BOOT_STARTED = time.perf_counter()
+
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from auth.auth import router as registration_router
 from auth.verification import router as verification_router
 from auth.jwt_access_refresh import router as jwt_access_refresh_router
@@ -8,15 +16,70 @@ from product_management.crud import router as product_management_router
 from cart.crud import router as cart_router
 from order_management.crud import router as order_management_router
 from users_management.crud import router as users_management_router
+from monitoring.crud import router as monitoring_router
+from monitoring.instrumentation import InstrumentationMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
-from tasks import delete_unverified_users
+from cache import close_redis
+from config import CACHE_BACKEND, CART_BACKEND, CLEANUP_ON_STARTUP, DB_MAX_CONNECTIONS, DB_MAX_OVERFLOW, DB_POOL_SIZE, STARTUP_TARGET_MS, WEB_CONCURRENCY
+from database import engine, warm_up_pool
+from mailer import mailer
+from monitoring import instrumentation
+
+# Логгер uvicorn настроен на INFO и в uvicorn, и в воркерах gunicorn
+logger = logging.getLogger("uvicorn.error")
+
+
+def check_workers():
+    # Состояние в памяти процесса у каждого воркера своё: версия каталога
+    # (и ETag), роли и корзины разошлись бы между воркерами
+    if WEB_CONCURRENCY > 1 and "memory" in (CACHE_BACKEND, CART_BACKEND):
+        raise RuntimeError(
+            f"WEB_CONCURRENCY={WEB_CONCURRENCY} requires shared state: "
+            f"set CACHE_BACKEND=redis (now {CACHE_BACKEND}) and CART_BACKEND=redis or postgres (now {CART_BACKEND})"
+        )
+
+    if DB_MAX_CONNECTIONS and WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW) > DB_MAX_CONNECTIONS:
+        logger.warning(
+            "%d workers x (pool %d + overflow %d) DB connections exceed DB_MAX_CONNECTIONS=%d",
+            WEB_CONCURRENCY, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_MAX_CONNECTIONS
+        )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    check_workers()
+
+    try:
+        opened = await warm_up_pool()
+    except Exception:
+        # База недоступна при старте — соединения откроются по первым запросам
+        logger.exception("Pool warm-up failed")
+        opened = 0
+
+    if CLEANUP_ON_STARTUP:
+        # Импорт Celery только если очистка действительно нужна
+        from tasks import delete_unverified_users
+        delete_unverified_users.apply_async()
+
+    startup_ms = (time.perf_counter() - BOOT_STARTED) * 1000
+    instrumentation.startup_seconds = startup_ms / 1000
+    log = logger.warning if startup_ms > STARTUP_TARGET_MS else logger.info
+    log("Cold start %.0f ms (target %d ms), %d DB connections warmed up", startup_ms, STARTUP_TARGET_MS, opened)
+
+    yield
+
+    await mailer.close()
+    await close_redis()
+    await engine.dispose()
 
 
 app = FastAPI(
     title="Coffee",
     version="1.0.0",
-    description=""
+    description="",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -27,6 +90,9 @@ app.add_middleware(
     allow_headers=["*"],  
 )
 
+# Время ответа и запросы к БД по маршрутам, заголовок Server-Timing
+app.add_middleware(InstrumentationMiddleware)
+
 app.include_router(registration_router, prefix="/auth", tags=['Authentication'])
 app.include_router(verification_router, prefix="/auth", tags=['Authentication'])
 app.include_router(jwt_access_refresh_router, prefix="/auth", tags=['Authentication'])
@@ -35,7 +101,4 @@ app.include_router(categories_management_router, prefix="/category", tags=['Cate
 app.include_router(product_management_router, prefix="/product", tags=['Product-management'])
 app.include_router(cart_router, prefix="/cart", tags=['Cart'])
 app.include_router(order_management_router, prefix="/order", tags=['Order-management'])
-
-@app.on_event("startup")
-async def startup_event():
-    delete_unverified_users.apply_async()
\ No newline at end of file
+app.include_router(monitoring_router, prefix="/monitoring", tags=['Monitoring'])
\ No newline at end of file
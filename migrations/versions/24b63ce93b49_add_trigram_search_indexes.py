@@ -0,0 +1,34 @@
+"""add trigram search indexes
+
+Revision ID: 24b63ce93b49
+Revises: e2516d36e23f
+Create Date: 2026-10-18 10:48:05.217730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '24b63ce93b49'
+down_revision: Union[str, None] = 'e2516d36e23f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    op.create_index('ix_product_name_trgm', 'product', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_product_description_trgm', 'product', ['description'], unique=False, postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
+    op.create_index('ix_category_name_trgm', 'category', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_category_description_trgm', 'category', ['description'], unique=False, postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_category_description_trgm', table_name='category')
+    op.drop_index('ix_category_name_trgm', table_name='category')
+    op.drop_index('ix_product_description_trgm', table_name='product')
+    op.drop_index('ix_product_name_trgm', table_name='product')
+    # Расширение pg_trgm не удаляем: им могут пользоваться другие объекты БД
@@ -0,0 +1,47 @@
+"""add unique (user_id, product_id) in cart table
+
+Revision ID: 645e4657ba9b
+Revises: ae774d44754b
+Create Date: 2026-10-18 13:21:50.318762
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '645e4657ba9b'
+down_revision: Union[str, None] = 'ae774d44754b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Схлопываем дубликаты строк корзины: количество суммируется в строку с минимальным id
+    op.execute("""
+        UPDATE cart SET quantity = dup.total
+        FROM (
+            SELECT min(id) AS id, sum(quantity) AS total
+            FROM cart
+            GROUP BY user_id, product_id
+            HAVING count(*) > 1
+        ) AS dup
+        WHERE cart.id = dup.id;
+    """)
+    op.execute("""
+        DELETE FROM cart
+        USING cart AS keep
+        WHERE cart.user_id = keep.user_id
+          AND cart.product_id = keep.product_id
+          AND cart.id > keep.id;
+    """)
+    op.create_unique_constraint('uq_cart_user_id_product_id', 'cart', ['user_id', 'product_id'])
+    # Индекс уникального ограничения начинается с user_id и заменяет ix_cart_user_id
+    op.drop_index('ix_cart_user_id', table_name='cart')
+
+
+def downgrade() -> None:
+    op.create_index('ix_cart_user_id', 'cart', ['user_id'], unique=False)
+    op.drop_constraint('uq_cart_user_id_product_id', 'cart', type_='unique')
@@ -0,0 +1,73 @@
+# Бюджеты маршрутов: (максимум запросов к БД, максимум времени до начала
+# ответа в мс). Число запросов — худший случай, с промахами кешей роли,
+# каталога и аккаунта. None — без ограничения. Маршрута нет в списке —
+# бюджет не проверяется; tests/ требуют бюджет для каждого маршрута и
+# проверяют его в тесте маршрута через count_queries.
+ROUTE_BUDGETS = {
+    # Хеширование bcrypt занимает сотни миллисекунд
+    "POST /auth/registration": (3, 1000),
+    "POST /auth/authentication": (1, 1000),
+    "POST /auth/access": (1, 200),
+    "POST /auth/refresh": (1, 200),
+    "POST /auth/verification": (3, 300),
+
+    "POST /cart/cart": (2, 300),
+    "POST /cart/cart/batch": (2, 300),
+    "DELETE /cart/cart/{id}": (1, 200),
+    "DELETE /cart/cart": (1, 200),
+
+    "POST /category/category": (2, 300),
+    "GET /category/categories": (1, 200),
+    "GET /category/category/{id}": (1, 200),
+    "PUT /category/category/{id}": (3, 300),
+    "PATCH /category/category/{id}": (3, 300),
+    "DELETE /category/category/{id}": (4, 300),
+
+    "POST /product/product": (2, 300),
+    "POST /product/products/import": (6, 10000),
+    "GET /product/products": (1, 200),
+    "GET /product/products/export": (3, None),
+    "GET /product/product/{id}": (1, 200),
+    "PUT /product/product/{id}": (4, 300),
+    "PATCH /product/product/{id}": (4, 300),
+    "DELETE /product/product/{id}": (3, 300),
+
+    # Заказ: корзина, заказ, строки заказа (executemany), письмо в outbox
+    "POST /order/order": (4, 500),
+    "GET /order/orders": (2, 300),
+    "GET /order/orders/export": (3, None),
+    "GET /order/orders/analytics/revenue": (2, 2000),
+    "GET /order/orders/analytics/top-products": (2, 2000),
+    "GET /order/orders/analytics/basket": (2, 2000),
+    "GET /order/order/{id}": (2, 200),
+    "PUT /order/order/{id}": (3, 300),
+    "PATCH /order/order/{id}": (3, 300),
+    "DELETE /order/order/{id}": (3, 300),
+
+    "POST /user/me": (1, 200),
+    "GET /user/users": (2, 300),
+    "GET /user/users/export": (3, None),
+    "GET /user/user/{id}": (2, 200),
+    "PUT /user/user/{id}": (2, 300),
+    "PATCH /user/user/{id}": (2, 300),
+    "DELETE /user/user/{id}": (6, 500),
+
+    "GET /monitoring/pool": (1, 200),
+    "GET /monitoring/stats": (1, 200),
+    "GET /monitoring/metrics": (1, 200),
+}
+
+
+def check_budget(route: str, queries: int, elapsed_ms: float) -> list:
+    """Возвращает список превышений бюджета маршрута (пустой, если их нет)."""
+    budget = ROUTE_BUDGETS.get(route)
+    if budget is None:
+        return []
+
+    max_queries, max_ms = budget
+    violations = []
+    if max_queries is not None and queries > max_queries:
+        violations.append(f"{queries} queries > {max_queries}")
+    if max_ms is not None and elapsed_ms > max_ms:
+        violations.append(f"{elapsed_ms:.0f} ms > {max_ms} ms")
+    return violations
\ No newline at end of file
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from auth.security import check_admin, security
+from auth.unit import hash_pool_stats
+from cache import cache_stats
+from config import METRICS_TOKEN
+from database import get_db, pool_prometheus_lines, pool_stats
+from monitoring.instrumentation import prometheus_lines
+from mailer import mailer
+from monitoring.schemas import PoolStats, StatsResponse
+
+router = APIRouter()
+
+@router.get("/pool", response_model=PoolStats)
+async def get_pool_stats(
+    payload=Depends(check_admin)
+) -> PoolStats:
+    return PoolStats(**pool_stats())
+
+
+@router.get("/stats", response_model=StatsResponse)
+async def get_stats(
+    payload=Depends(check_admin)
+) -> StatsResponse:
+    return StatsResponse(
+        db_pool=pool_stats(),
+        caches=cache_stats(),
+        password_hash=hash_pool_stats,
+        smtp=mailer.stats()
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(request: Request, db: AsyncSession = Depends(get_db)) -> PlainTextResponse:
+    # Prometheus не передаёт JWT, поэтому доступ — по отдельному токену.
+    # Без METRICS_TOKEN метрики доступны только администратору.
+    # Счётчики — процесса, ответившего на запрос: под gunicorn каждый
+    # воркер отдаёт свои (см. README)
+    if METRICS_TOKEN:
+        if request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    else:
+        await check_admin(await security(request), db)
+
+    lines = prometheus_lines() + pool_prometheus_lines()
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
\ No newline at end of file
@@ -0,0 +1,206 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from config import QUERY_BUDGETS, SERVER_TIMING, SLOW_QUERY_MS
+from monitoring.budgets import check_budget
+from monitoring.metrics import Histogram, render_counter, render_gauge, render_histogram
+
+logger = logging.getLogger("instrumentation")
+
+# Корзины для числа запросов к БД за один HTTP-запрос
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class QueryStats:
+    """
+    Запросы к БД в рамках одного HTTP-запроса (или блока count_queries).
+    Вложенные блоки передают запросы во внешний: count_queries() в тестах
+    видит запросы, посчитанные middleware.
+    """
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements = []
+
+    def record(self, statement: str, elapsed: float):
+        self.queries += 1
+        self.db_seconds += elapsed
+        self.statements.append(statement)
+        if self.parent is not None:
+            self.parent.record(statement, elapsed)
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.latency = Histogram()
+        self.db_seconds = Histogram()
+        self.queries = Histogram(buckets=QUERY_COUNT_BUCKETS)
+        self.errors = 0
+        self.budget_violations = 0
+
+
+current_stats: ContextVar = ContextVar("query_stats", default=None)
+
+# Все запросы к БД процесса и метрики по маршрутам ("GET /product/{id}")
+query_seconds = Histogram()
+slow_queries = 0
+route_metrics = {}
+# Время холодного старта веб-процесса (выставляется в lifespan в main.py)
+startup_seconds = None
+
+
+@contextmanager
+def count_queries():
+    """
+    Считает запросы к БД внутри блока:
+
+        with count_queries() as stats:
+            ...
+        assert stats.queries <= 2
+    """
+    stats = QueryStats(parent=current_stats.get())
+    token = current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_stats.reset(token)
+
+
+def instrument_engine(engine):
+    # События синхронного движка; для AsyncEngine — engine.sync_engine.
+    # SQLAlchemy выполняет их в контексте вызывающей задачи asyncio,
+    # поэтому current_stats указывает на статистику текущего запроса
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # Время старта хранится в контексте выполнения: у упавшего запроса
+        # after_cursor_execute не вызывается, и контекст просто исчезает
+        if context is not None:
+            context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        global slow_queries
+        started = getattr(context, "_query_start", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        query_seconds.observe(elapsed)
+
+        stats = current_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+        # В лог попадает форма запроса с плейсхолдерами, без значений
+        if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+            slow_queries += 1
+            logger.warning("Slow query %.1f ms: %s", elapsed * 1000, " ".join(statement.split()))
+
+
+def route_key(scope) -> str:
+    # Шаблон пути маршрута ограничивает число меток (не /product/1, /product/2, ...)
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route is not None else 'unmatched'}"
+
+
+def get_route_metrics(key: str) -> RouteMetrics:
+    metrics = route_metrics.get(key)
+    if metrics is None:
+        metrics = route_metrics[key] = RouteMetrics()
+    return metrics
+
+
+class InstrumentationMiddleware:
+    """
+    ASGI-middleware: время ответа, число запросов к БД и время в БД по
+    маршрутам, логирование необработанных ошибок и заголовок Server-Timing.
+
+    Бюджеты из monitoring/budgets.py проверяются в момент начала ответа:
+    QUERY_BUDGETS=warn пишет превышение в лог и в счётчик метрик, off
+    отключает проверку. Ответ не меняется; в CI бюджеты проверяют тесты
+    (tests/, count_queries).
+    """
+
+    def __init__(self, app, server_timing: bool = SERVER_TIMING, budgets: str = QUERY_BUDGETS):
+        self.app = app
+        self.server_timing = server_timing
+        self.budgets = budgets
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(parent=current_stats.get())
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed_ms = (time.perf_counter() - started) * 1000
+
+                if self.budgets != "off":
+                    key = route_key(scope)
+                    violations = check_budget(key, stats.queries, elapsed_ms)
+                    if violations:
+                        get_route_metrics(key).budget_violations += 1
+                        logger.warning("Budget exceeded for %s: %s", key, ", ".join(violations))
+
+                if self.server_timing:
+                    value = f"db;dur={stats.db_seconds * 1000:.1f};desc=\"{stats.queries} queries\", app;dur={elapsed_ms:.1f}"
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", value.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            logger.exception("Unhandled error in %s %s", scope["method"], scope["path"])
+            raise
+        finally:
+            current_stats.reset(token)
+            self.observe(scope, status_code, time.perf_counter() - started, stats)
+
+    def observe(self, scope, status_code: int, elapsed: float, stats: QueryStats):
+        metrics = get_route_metrics(route_key(scope))
+        metrics.latency.observe(elapsed)
+        metrics.db_seconds.observe(stats.db_seconds)
+        metrics.queries.observe(stats.queries)
+        if status_code >= 500:
+            metrics.errors += 1
+
+
+def prometheus_lines() -> list:
+    lines = [
+        "# TYPE http_request_duration_seconds histogram",
+        "# TYPE http_request_db_seconds histogram",
+        "# TYPE http_request_queries histogram",
+        "# TYPE http_request_errors_total counter",
+        "# TYPE http_request_budget_violations_total counter",
+    ]
+    for key, metrics in sorted(route_metrics.items()):
+        method, path = key.split(" ", 1)
+        labels = {"method": method, "route": path}
+        lines += render_histogram("http_request_duration_seconds", metrics.latency, labels)
+        lines += render_histogram("http_request_db_seconds", metrics.db_seconds, labels)
+        lines += render_histogram("http_request_queries", metrics.queries, labels)
+        lines.append(render_counter("http_request_errors_total", metrics.errors, labels))
+        lines.append(render_counter("http_request_budget_violations_total", metrics.budget_violations, labels))
+
+    lines.append("# TYPE db_query_duration_seconds histogram")
+    lines += render_histogram("db_query_duration_seconds", query_seconds)
+    lines.append("# TYPE db_slow_queries_total counter")
+    lines.append(render_counter("db_slow_queries_total", slow_queries))
+    # Метрики — одного воркера: по pid видно, какой из них ответил
+    lines.append("# TYPE app_worker_info gauge")
+    lines.append(render_gauge("app_worker_info", 1, {"pid": os.getpid()}))
+    if startup_seconds is not None:
+        lines.append("# TYPE app_startup_seconds gauge")
+        lines.append(render_gauge("app_startup_seconds", startup_seconds))
+    return lines
\ No newline at end of file
@@ -0,0 +1,60 @@
+import bisect
+
+
+class Histogram:
+    """Простая гистограмма с фиксированными границами корзин (секунды)."""
+
+    def __init__(self, buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> dict:
+        # Накопительные значения по корзинам, как в Prometheus
+        buckets = {}
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            buckets[str(bound)] = total
+        buckets["+Inf"] = self.count
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+def _labels(labels: dict, **extra) -> str:
+    labels = {**labels, **extra}
+    if not labels:
+        return ""
+    escaped = {
+        key: str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for key, value in labels.items()
+    }
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped.items()) + "}"
+
+
+def render_histogram(name: str, histogram: Histogram, labels: dict = None) -> list:
+    # Строки гистограммы в текстовом формате Prometheus
+    labels = labels or {}
+    snapshot = histogram.snapshot()
+    lines = [
+        f"{name}_bucket{_labels(labels, le=bound)} {count}"
+        for bound, count in snapshot["buckets"].items()
+    ]
+    lines.append(f"{name}_sum{_labels(labels)} {snapshot['sum']}")
+    lines.append(f"{name}_count{_labels(labels)} {snapshot['count']}")
+    return lines
+
+
+def render_counter(name: str, value, labels: dict = None) -> str:
+    # Монотонный счётчик: имя оканчивается на _total (# TYPE ... counter)
+    return f"{name}{_labels(labels or {})} {value}"
+
+
+def render_gauge(name: str, value, labels: dict = None) -> str:
+    # Текущее значение, может уменьшаться (# TYPE ... gauge)
+    return f"{name}{_labels(labels or {})} {value}"
\ No newline at end of file
@@ -0,0 +1,29 @@
+from typing import Dict
+from pydantic import BaseModel
+
+class HistogramStats(BaseModel):
+    count: int
+    sum: float
+    buckets: Dict[str, int]
+
+class PoolStats(BaseModel):
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    wait_seconds: HistogramStats
+
+class SMTPStats(BaseModel):
+    sent: int
+    failed: int
+    retries: int
+    connects: int
+    reused: int
+    idle: int
+    send_seconds: HistogramStats
+
+class StatsResponse(BaseModel):
+    db_pool: PoolStats
+    caches: Dict[str, Dict[str, float]]
+    password_hash: Dict[str, float]
+    smtp: SMTPStats
\ No newline at end of file
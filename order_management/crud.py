@@ -1,15 +1,21 @@
 import json
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 from fastapi.responses import JSONResponse
 from sqlalchemy import and_, asc, delete, desc, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from auth.security import check_admin, check_user
-from order_management.send_email import send_email
-from order_management.schemas import OrderCreateResponse, OrderResponse, OrderUpdatePatch, OrderUpdatePut, Orders, OrdersDeleteResponse, OrdersResponse, QueryParams
+from order_management.send_email import ORDER_SUBJECT, format_body
+from order_management.schemas import AnalyticsParams, BasketStats, OrderCreateResponse, OrderResponse, OrderUpdatePatch, OrderUpdatePut, Orders, OrdersDeleteResponse, OrdersResponse, QueryParams, RevenueResponse, TopProductsParams, TopProductsResponse
+from order_management.unit import basket_query, enqueue_outbox_emails, filter_orders, order_query, revenue_query, top_products_query
+from config import ANALYTICS_USE_MATVIEW
 from database import get_db
+from users_management.unit import invalidate_user_info
+from pagination import page_cursors
+from export import stream_export
+from serialization import trusted_response
 from product_management.models import Product
-from order_management.models import Order, OrderItems
-from cart.models import Cart
+from order_management.models import EmailOutbox, Order, OrderItems
+from cart.store import cart_store
 from auth.models import *
 
 router = APIRouter()
@@ -21,15 +27,12 @@ async def create_order(
     db: AsyncSession = Depends(get_db)
 ):
     user_id = payload["sub"]
+    claimed = False
     try:
         async with db.begin():
-            # Получаем товары из корзины пользователя
-            result = await db.execute(
-                select(Cart, Product)
-                .join(Product, Product.c.id == Cart.c.product_id)
-                .where(Cart.c.user_id == user_id, Product.c.is_available == True)
-            )
-            cart_items = result.fetchall()
+            # Забираем товары из корзины (см. cart/store.py)
+            token, cart_items = await cart_store.checkout(user_id, db)
+            claimed = True
 
             if not cart_items:
                 raise HTTPException(status_code=400, detail="Cart is empty or products unavailable")
@@ -41,34 +44,63 @@ async def create_order(
                 "status": "Ожидает"
                 }
 
-            result = await db.execute(Order.insert().returning(Order.c.id).values(new_order))
-            order_id = result.scalar_one()
+            # Почта администратора возвращается вместе с id заказа
+            admin_email = (
+                select(User.c.email)
+                .where(User.c.role_id == 2)
+                .limit(1)
+                .scalar_subquery()
+            )
+            result = await db.execute(
+                Order.insert()
+                .values(new_order)
+                .returning(Order.c.id, admin_email.label("admin_email"))
+            )
+            order_id, admin_mail = result.one()
 
-            # Добавляем товары в таблицу OrderItems
-            for item in cart_items:
-                order_item = {
-                    "order_id": order_id,
-                    "product_id": item.product_id,
-                    "quantity": item.quantity,
-                    "price": item.price
-                }
-                await db.execute(OrderItems.insert().values(order_item))
+            # Добавляем товары в таблицу OrderItems одним executemany
+            await db.execute(
+                OrderItems.insert(),
+                [
+                    {
+                        "order_id": order_id,
+                        "product_id": item.product_id,
+                        "quantity": item.quantity,
+                        "price": item.price
+                    }
+                    for item in cart_items
+                ]
+            )
 
-            # Удаляем товары из корзины
-            await db.execute(delete(Cart).where(Cart.c.user_id == user_id))
-            
-            admin = await db.execute(select(User).where(User.c.role_id == 2))
-            admin_mail = admin.fetchone()
+            # Письмо администратору попадает в outbox в той же транзакции
+            if admin_mail:
+                await db.execute(
+                    EmailOutbox.insert().values(
+                        recipient=admin_mail,
+                        subject=ORDER_SUBJECT,
+                        body=format_body({"order_id": order_id, **new_order})
+                    )
+                )
 
-            background_tasks.add_task(send_email, recipient_email=admin_mail.email, body=f"{new_order}")
+            # Корзина вне Postgres всё ещё за этим оформлением
+            await cart_store.checkout_confirm(user_id, token)
 
     except HTTPException as http_exc:
+        # Заказ не создан: корзина вне Postgres возвращается на место
+        if claimed:
+            await cart_store.checkout_failed(user_id, token)
         raise http_exc
     
     except Exception as e:
         print(f"Error occurred: {e}")
+        if claimed:
+            await cart_store.checkout_failed(user_id, token)
         raise HTTPException(status_code=500, detail="Error when placing an order")
 
+    await cart_store.checkout_done(user_id, token)
+    await invalidate_user_info(user_id)
+    background_tasks.add_task(enqueue_outbox_emails)
+
     return OrderCreateResponse(status=True, new_order=new_order)
 
 
@@ -79,58 +111,97 @@ async def get_orders(
     db: AsyncSession = Depends(get_db)
 ) -> Orders:
     
-    query = select(Order) 
-
-    # Фильтры
-    if query_params.filter:
-        try:
-            filters_dict = json.loads(query_params.filter) 
-            filters = [
-                getattr(Order.c, field) == value 
-                for field, value in filters_dict.items()
-                if hasattr(Order.c, field) 
-            ]
-            if filters:
-                query = query.where(and_(*filters)) 
-        except json.JSONDecodeError:
-            return JSONResponse(content={"detail": "Invalid filter format. Please provide a valid JSON string."}, status_code=400)
-
-    # Поиск
-    if query_params.search:
-        search_filter = (
-            Order.c.status.ilike(f"%{query_params.search}%")
-        )
-        query = query.where(search_filter)
-
-    if query_params.total_price:
-        total_price_filter = (
-            Order.c.total_price == int(query_params.total_price) 
-        )
-        query = query.where(total_price_filter)
+    query = filter_orders(select(Order), query_params)
 
-    # Сортировка
-    if query_params.sort_by and hasattr(Order.c, query_params.sort_by):
-        order_by_column = getattr(Order.c, query_params.sort_by)
-        query = query.order_by(asc(order_by_column) if query_params.order == "asc" else desc(order_by_column))
-    
-    # Пагинация
-    offset = (query_params.page - 1) * query_params.page_size
-    query = query.offset(offset).limit(query_params.page_size)
+    # Сортировка и пагинация
+    query, sort_column = order_query.paginate(query, query_params)
 
     # Выполнение запроса
     result = await db.execute(query)
-    orders = result.fetchall()
+    orders, next_cursor, prev_cursor = page_cursors(result.fetchall(), sort_column, query_params)
 
     if not orders:
         return Orders(data=[])
     
-    return Orders(
-        data=[{
+    return trusted_response({
+        "data": [{
             "id": order.id,
             "total_price": order.total_price,
             "status": order.status
-        } for order in orders]
-    )
+        } for order in orders],
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor
+    })
+
+
+@router.get("/orders/export")
+async def export_orders(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    query_params: QueryParams = Depends(),
+    payload=Depends(check_admin)
+):
+    # Те же фильтры, поиск и сортировка, что у /orders, но без страниц
+    query = filter_orders(select(Order.c.id, Order.c.user_id, Order.c.total_price, Order.c.status, Order.c.created_at), query_params)
+    query = order_query.sort(query, query_params)
+
+    return stream_export(query, "orders", fmt)
+
+
+@router.get("/orders/analytics/revenue", response_model=RevenueResponse)
+async def get_revenue(
+    query_params: AnalyticsParams = Depends(),
+    payload=Depends(check_admin),
+    db: AsyncSession = Depends(get_db)
+) -> RevenueResponse:
+    # Выручка по дням и статусам. С ANALYTICS_USE_MATVIEW данные берутся из
+    # order_daily_revenue и отстают не больше чем на ANALYTICS_REFRESH_SECONDS
+    result = await db.execute(revenue_query(query_params, ANALYTICS_USE_MATVIEW))
+
+    return trusted_response({
+        "data": [{
+            "day": row.day,
+            "status": row.status,
+            "orders": row.orders,
+            "revenue": int(row.revenue)
+        } for row in result.fetchall()]
+    })
+
+
+@router.get("/orders/analytics/top-products", response_model=TopProductsResponse)
+async def get_top_products(
+    query_params: TopProductsParams = Depends(),
+    payload=Depends(check_admin),
+    db: AsyncSession = Depends(get_db)
+) -> TopProductsResponse:
+    result = await db.execute(top_products_query(query_params))
+
+    return trusted_response({
+        "data": [{
+            "product_id": row.product_id,
+            "product_name": row.product_name,
+            "quantity": int(row.quantity),
+            "revenue": int(row.revenue),
+            "orders": row.orders
+        } for row in result.fetchall()]
+    })
+
+
+@router.get("/orders/analytics/basket", response_model=BasketStats)
+async def get_basket_stats(
+    query_params: AnalyticsParams = Depends(),
+    payload=Depends(check_admin),
+    db: AsyncSession = Depends(get_db)
+) -> BasketStats:
+    result = await db.execute(basket_query(query_params))
+    stats = result.one()
+
+    return trusted_response({
+        "orders": stats.orders,
+        "revenue": int(stats.revenue),
+        "avg_total": float(stats.avg_total),
+        "avg_items": float(stats.avg_items),
+        "avg_lines": float(stats.avg_lines)
+    })
 
 
 @router.get("/order/{id}", response_model=OrderResponse)
@@ -152,8 +223,6 @@ async def get_order(
     items_result = await db.execute(items_stmt)
     items = items_result.fetchall()
 
-    print(items)
-
     return OrderResponse(
         id=order.id,
         total_price=order.total_price,
@@ -178,7 +247,7 @@ async def update_order_put(
     try:
         async with db.begin():
             order_query = await db.execute(select(Order).where(Order.c.id == id))
-            order = order_query.scalar_one_or_none()
+            order = order_query.fetchone()
 
             if not order:
                 raise HTTPException(status_code=404, detail="Order not found")
@@ -194,6 +263,8 @@ async def update_order_put(
     except HTTPException as http_exc:
         raise http_exc
     
+    await invalidate_user_info(order.user_id)
+
     return OrdersResponse(
             id=id,
             total_price=data.total_price,
@@ -211,7 +282,7 @@ async def update_order_patch(
     try:
         async with db.begin():
             order_query = await db.execute(select(Order).where(Order.c.id == id))
-            order = order_query.scalar_one_or_none()
+            order = order_query.fetchone()
 
             if not order:
                 raise HTTPException(status_code=404, detail="Order not found")
@@ -228,6 +299,8 @@ async def update_order_patch(
         print(f"Error occurred: {e}")
         raise HTTPException(status_code=500, detail="Error when updating the order")
     
+    await invalidate_user_info(order.user_id)
+
     return OrdersResponse(
             id=id,
             total_price=data.total_price,
@@ -261,5 +334,7 @@ async def delete_order(
         print(f"Error occurred: {e}")
         raise HTTPException(status_code=500, detail="Error deleting order")
 
+    await invalidate_user_info(user_id)
+
     return OrdersDeleteResponse(status=True, message=f"Order {id} deleted successfully")
 
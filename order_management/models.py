@@ -1,21 +1,51 @@
-from sqlalchemy import Table, Column, Integer, String, ForeignKey, Boolean, JSON, Text
+from sqlalchemy import Index, Table, Column, Integer, String, ForeignKey, Boolean, JSON, Text, Date, DateTime, column, func, table, text
 from models import metadata
 
 Order = Table(
     "order",
     metadata,
     Column("id", Integer, primary_key=True),
-    Column("user_id", Integer, ForeignKey("user.id")),
-    Column("total_price", Integer, nullable=False),
-    Column("status", String, default="Ожидает"),
+    Column("user_id", Integer, ForeignKey("user.id"), index=True),
+    Column("total_price", Integer, nullable=False, index=True),
+    Column("status", String, default="Ожидает", index=True),
+    Column("created_at", DateTime(timezone=True), nullable=False, server_default=func.now(), index=True),
 )
 
 OrderItems = Table(
     "order_items",
     metadata,
     Column("id", Integer, primary_key=True),
-    Column("order_id", Integer, ForeignKey("order.id")),
+    Column("order_id", Integer, ForeignKey("order.id"), index=True),
     Column("product_id", Integer, ForeignKey("product.id")),
     Column("quantity", Integer, nullable=False),
     Column("price", Integer, nullable=False)
 )
+
+# Исходящие письма: пишутся в одной транзакции с заказом,
+# отправляются задачей Celery send_outbox_emails
+EmailOutbox = Table(
+    "email_outbox",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("recipient", String, nullable=False),
+    Column("subject", String, nullable=False),
+    Column("body", Text, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Column("sent_at", DateTime(timezone=True), nullable=True),
+    Column("attempts", Integer, nullable=False, server_default="0"),
+    Column("last_error", Text, nullable=True),
+    # Не раньше этого времени письмо отправляется повторно (NULL — сразу)
+    Column("next_attempt_at", DateTime(timezone=True), nullable=True),
+    Index("ix_email_outbox_pending", "id", postgresql_where=text("sent_at IS NULL")),
+)
+
+# Материализованное представление (создаётся миграцией, обновляется задачей
+# Celery refresh_order_daily_revenue). Объявлено через table(), чтобы не
+# попадать в metadata и автогенерацию Alembic
+OrderDailyRevenue = table(
+    "order_daily_revenue",
+    column("day", Date),
+    column("status", String),
+    column("orders", Integer),
+    column("revenue", Integer),
+)
\ No newline at end of file
@@ -1,6 +1,8 @@
+from datetime import date
 from typing import List, Optional
 from fastapi import Query
 from pydantic import BaseModel
+from query_engine import ListQueryParams
 
 
 
@@ -20,6 +22,8 @@ class OrdersResponse(BaseModel):
 
 class Orders(BaseModel):
     data: List[OrdersResponse] 
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 class OrderItems(BaseModel):
     product_id: int
@@ -48,11 +52,40 @@ class OrdersDeleteResponse(BaseModel):
     status: bool
     message: str
 
-class QueryParams(BaseModel):
-    sort_by: Optional[str] = None  # Поле для сортировки
-    order: Optional[str] = "asc"  # Порядок сортировки: asc (по возрастанию) или desc (по убыванию)
-    search: Optional[str] = None  # Поиск по тексту
-    total_price: Optional[int] = None  # Поиск по тексту
-    filter: Optional[str] = Query(None, description="Фильтры в формате JSON, например: {'field1': 'value1', 'field2': 'value2'}")  # Фильтры как строка
-    page: int = 1  # Номер страницы
-    page_size: int = 10  # Количество записей на странице
\ No newline at end of file
+class QueryParams(ListQueryParams):
+    total_price: Optional[int] = None  # Точное значение суммы заказа
+    filter: Optional[str] = Query(None, description="Фильтры в формате JSON, например: {'status': 'Ожидает', 'total_price': {'gte': 100}}")  # Фильтры как строка
+
+class AnalyticsParams(BaseModel):
+    date_from: Optional[date] = None  # Начало периода (включительно, UTC)
+    date_to: Optional[date] = None  # Конец периода (включительно, UTC)
+    status: Optional[str] = None  # Только заказы с этим статусом
+
+class TopProductsParams(AnalyticsParams):
+    limit: int = Query(10, ge=1, le=100)  # Количество товаров в ответе
+
+class RevenueRow(BaseModel):
+    day: date
+    status: Optional[str]
+    orders: int
+    revenue: int
+
+class RevenueResponse(BaseModel):
+    data: List[RevenueRow]
+
+class TopProduct(BaseModel):
+    product_id: int
+    product_name: Optional[str]
+    quantity: int
+    revenue: int
+    orders: int
+
+class TopProductsResponse(BaseModel):
+    data: List[TopProduct]
+
+class BasketStats(BaseModel):
+    orders: int
+    revenue: int
+    avg_total: float
+    avg_items: float
+    avg_lines: float
\ No newline at end of file
@@ -0,0 +1,117 @@
+from datetime import datetime, time, timedelta, timezone
+from sqlalchemy import Date, cast, desc, func, literal_column, select
+from order_management.models import Order, OrderDailyRevenue, OrderItems
+from product_management.models import Product
+from query_engine import QueryEngine
+
+
+def order_day(created_at):
+    # День заказа в UTC, как в представлении order_daily_revenue.
+    # 'UTC' подставляется литералом, чтобы выражение в SELECT и
+    # GROUP BY совпадало и не разъезжалось по параметрам запроса
+    return cast(func.timezone(literal_column("'UTC'"), created_at), Date)
+
+
+def order_filters(params) -> list:
+    # Границы периода по created_at, чтобы работал индекс ix_order_created_at
+    filters = []
+    if params.date_from:
+        filters.append(Order.c.created_at >= datetime.combine(params.date_from, time(), timezone.utc))
+    if params.date_to:
+        filters.append(Order.c.created_at < datetime.combine(params.date_to + timedelta(days=1), time(), timezone.utc))
+    if params.status:
+        filters.append(Order.c.status == params.status)
+    return filters
+
+
+def revenue_query(params, use_matview: bool = False):
+    if use_matview:
+        view = OrderDailyRevenue
+        filters = []
+        if params.date_from:
+            filters.append(view.c.day >= params.date_from)
+        if params.date_to:
+            filters.append(view.c.day <= params.date_to)
+        if params.status:
+            filters.append(view.c.status == params.status)
+        return (
+            select(view.c.day, view.c.status, view.c.orders, view.c.revenue)
+            .where(*filters)
+            .order_by(view.c.day, view.c.status)
+        )
+
+    day = order_day(Order.c.created_at)
+    return (
+        select(
+            day.label("day"),
+            Order.c.status,
+            func.count().label("orders"),
+            func.coalesce(func.sum(Order.c.total_price), 0).label("revenue")
+        )
+        .where(*order_filters(params))
+        .group_by(day, Order.c.status)
+        .order_by(day, Order.c.status)
+    )
+
+
+def top_products_query(params):
+    quantity = func.sum(OrderItems.c.quantity)
+    return (
+        select(
+            OrderItems.c.product_id,
+            Product.c.name.label("product_name"),
+            quantity.label("quantity"),
+            func.sum(OrderItems.c.quantity * OrderItems.c.price).label("revenue"),
+            func.count(OrderItems.c.order_id.distinct()).label("orders")
+        )
+        .join(Order, Order.c.id == OrderItems.c.order_id)
+        .outerjoin(Product, Product.c.id == OrderItems.c.product_id)
+        .where(*order_filters(params))
+        .group_by(OrderItems.c.product_id, Product.c.name)
+        .order_by(desc(quantity), OrderItems.c.product_id)
+        .limit(params.limit)
+    )
+
+
+def basket_query(params):
+    # Сначала строки и товары по каждому заказу, затем средние по заказам
+    baskets = (
+        select(
+            Order.c.total_price,
+            func.coalesce(func.sum(OrderItems.c.quantity), 0).label("items"),
+            func.count(OrderItems.c.id).label("lines")
+        )
+        .outerjoin(OrderItems, OrderItems.c.order_id == Order.c.id)
+        .where(*order_filters(params))
+        .group_by(Order.c.id)
+        .subquery()
+    )
+    return select(
+        func.count().label("orders"),
+        func.coalesce(func.sum(baskets.c.total_price), 0).label("revenue"),
+        func.coalesce(func.avg(baskets.c.total_price), 0).label("avg_total"),
+        func.coalesce(func.avg(baskets.c.items), 0).label("avg_items"),
+        func.coalesce(func.avg(baskets.c.lines), 0).label("avg_lines")
+    )
+
+
+order_query = QueryEngine(
+    Order,
+    search=("status",),
+    filterable=("id", "user_id", "status", "total_price", "created_at"),
+    sortable=("user_id", "status", "total_price", "created_at")
+)
+
+
+def filter_orders(query, query_params):
+    """Фильтры и поиск из QueryParams (общие для списка и выгрузки)."""
+    query = order_query.apply(query, query_params)
+    if query_params.total_price:
+        query = query.where(Order.c.total_price == int(query_params.total_price))
+    return query
+
+
+def enqueue_outbox_emails():
+    # Celery импортируется при первом заказе, а не при старте веб-процесса
+    from tasks import send_outbox_emails
+    send_outbox_emails.delay()
\ No newline at end of file
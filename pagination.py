@@ -0,0 +1,146 @@
+import base64
+import json
+from datetime import date, datetime
+from fastapi import HTTPException
+from sqlalchemy import and_, asc, desc, or_
+
+
+# Курсор — base64 от JSON [sort_by, значение ключа сортировки, id строки]
+def encode_cursor(sort_by: str, value, row_id: int) -> str:
+    raw = json.dumps([sort_by, value, row_id], separators=(",", ":"), default=_dump_value)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort_column):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        sort_by, value, row_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if sort_by != sort_column.name or not _is_instance(row_id, int):
+        raise HTTPException(status_code=400, detail="Cursor does not match sort_by")
+
+    # Значение ключа сортировки попадает в запрос, поэтому его тип
+    # проверяется по колонке: иначе подделанный курсор дойдёт до asyncpg
+    if value is not None:
+        try:
+            value = _load_value(value, sort_column.type.python_type)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value, row_id
+
+
+def _is_instance(value, python_type) -> bool:
+    # bool в Python — подкласс int, но для колонок это разные типы
+    return isinstance(value, python_type) and (python_type is bool or not isinstance(value, bool))
+
+
+def _load_value(value, python_type):
+    if python_type in (datetime, date):
+        if not isinstance(value, str):
+            raise TypeError(f"Expected ISO date string, got {type(value).__name__}")
+        return python_type.fromisoformat(value)
+    if not _is_instance(value, python_type):
+        raise TypeError(f"Expected {python_type.__name__}, got {type(value).__name__}")
+    return value
+
+
+def _dump_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in cursor")
+
+
+def _after(column, id_column, value, row_id, descending: bool):
+    # Условие "строго после (value, row_id)" с учётом NULL:
+    # PostgreSQL ставит NULL в конец при ASC и в начало при DESC
+    if column is id_column:
+        return id_column < row_id if descending else id_column > row_id
+
+    if descending:
+        if value is None:
+            return or_(column.is_not(None), id_column < row_id)
+        return or_(column < value, and_(column == value, id_column < row_id))
+
+    if value is None:
+        return and_(column.is_(None), id_column > row_id)
+    condition = or_(column > value, and_(column == value, id_column > row_id))
+    return or_(condition, column.is_(None)) if column.nullable else condition
+
+
+def get_sort_column(table, query_params, unsortable=()):
+    # Неизвестные и запрещённые поля сортировки заменяются на id
+    if query_params.sort_by and query_params.sort_by not in unsortable and hasattr(table.c, query_params.sort_by):
+        return getattr(table.c, query_params.sort_by)
+    return table.c.id
+
+
+def sort_query(query, table, query_params, unsortable=()):
+    # Тот же порядок, что и в paginate, но без страниц (для выгрузки)
+    sort_column = get_sort_column(table, query_params, unsortable)
+    direction = asc if query_params.order == "asc" else desc
+    order_by = [direction(sort_column)]
+    if sort_column is not table.c.id:
+        order_by.append(direction(table.c.id))
+    return query.order_by(*order_by)
+
+
+def paginate(query, table, query_params, unsortable=()):
+    """
+    Добавляет сортировку и пагинацию к запросу.
+
+    Если передан курсор after/before, используется keyset-пагинация по
+    (sort_by, id), иначе — OFFSET по номеру страницы. id всегда участвует
+    в сортировке, поэтому порядок стабилен при равных значениях sort_by.
+    Возвращает запрос и колонку сортировки для page_cursors.
+    """
+    if query_params.after and query_params.before:
+        raise HTTPException(status_code=400, detail="Use either 'after' or 'before', not both")
+
+    id_column = table.c.id
+    sort_column = get_sort_column(table, query_params, unsortable)
+
+    descending = query_params.order != "asc"
+    cursor = query_params.after or query_params.before
+
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_column)
+        # Для before идём по индексу в обратную сторону, а порядок
+        # восстанавливаем в page_cursors
+        descending = descending != bool(query_params.before)
+        query = query.where(_after(sort_column, id_column, value, row_id, descending))
+
+    direction = desc if descending else asc
+    order_by = [direction(sort_column)]
+    if sort_column is not id_column:
+        order_by.append(direction(id_column))
+    query = query.order_by(*order_by)
+
+    if not cursor:
+        query = query.offset((query_params.page - 1) * query_params.page_size)
+    return query.limit(query_params.page_size), sort_column
+
+
+def page_cursors(rows, sort_column, query_params):
+    """
+    Возвращает строки в запрошенном порядке и курсоры соседних страниц.
+    Без колонки сортировки (ранжированный поиск) курсоров нет.
+    """
+    if query_params.before:
+        rows = rows[::-1]
+
+    if not rows or sort_column is None:
+        return rows, None, None
+
+    full_page = len(rows) == query_params.page_size
+    if query_params.before:
+        has_next, has_prev = True, full_page
+    else:
+        has_next, has_prev = full_page, bool(query_params.after) or query_params.page > 1
+
+    name = sort_column.name
+    first, last = rows[0], rows[-1]
+    next_cursor = encode_cursor(name, getattr(last, name), last.id) if has_next else None
+    prev_cursor = encode_cursor(name, getattr(first, name), first.id) if has_prev else None
+    return rows, next_cursor, prev_cursor
@@ -1,13 +1,18 @@
 import json
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy import and_, asc, delete, desc, or_, select, update
 from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from auth.security import check_admin
-from product_management.schemas import ProductCreate, ProductCreateResponse, Products, ProductsDeleteResponse, ProductsResponse, ProductsUpdate, ProductsUpdatePatch, ProductsUpdateResponse, ProductsUpdateResponsePatch, QueryParams
-from product_management.unit import get_product_by_id
+from product_management.schemas import ProductCreate, ProductCreateResponse, Products, ProductsDeleteResponse, ProductsResponse, ProductsUpdate, ProductsUpdatePatch, ProductsUpdateResponse, ProductsUpdateResponsePatch, ProductImportResponse, PRODUCT_IMPORT_OPENAPI, QueryParams
+from product_management.unit import check_import_rows, get_product_by_id, import_products, load_search_index, parse_import_rows, product_query, read_import_rows
+from cache import catalog_cache, get_catalog, make_key
 from database import get_db
+from http_cache import cache_headers, catalog_etag, is_not_modified
+from serialization import trusted_response
+from pagination import page_cursors
+from export import stream_export
 from product_management.models import Product
 from categories_management.models import Category
 
@@ -33,53 +38,130 @@ async def add_product(
                 detail="Internal Server Error: Could not add new product"
             )
 
+    await catalog_cache.bump_version()
+
     return ProductCreateResponse(
         status=True,
         new_product=new_product
     )
 
+@router.post("/products/import", response_model=ProductImportResponse, openapi_extra=PRODUCT_IMPORT_OPENAPI)
+async def import_products_bulk(
+    request: Request,
+    payload=Depends(check_admin),
+    db: AsyncSession = Depends(get_db)
+) -> ProductImportResponse:
+    # Тело — JSON-массив товаров, CSV (text/csv) или CSV-файл в поле file.
+    # Строки с ошибками пропускаются и перечисляются в ответе
+    rows = await read_import_rows(request)
+    valid, errors = parse_import_rows(rows)
+    inserted = updated = 0
+
+    try:
+        async with db.begin():
+            valid, check_errors = await check_import_rows(valid, db)
+            errors.extend(check_errors)
+            if valid:
+                inserted, updated = await import_products(valid, db)
+
+    except HTTPException as http_exc:
+        raise http_exc
+
+    except Exception as e:
+            print(f"Error occurred: {e}")
+            raise HTTPException(
+                status_code=500,
+                detail="Internal Server Error: Could not import products"
+            )
+
+    if inserted or updated:
+        await catalog_cache.bump_version()
+
+    return ProductImportResponse(
+        status=not errors,
+        inserted=inserted,
+        updated=updated,
+        errors=sorted(errors, key=lambda error: error["row"])
+    )
+
+
 @router.get("/products", response_model=ProductsResponse)
 async def products(
+    request: Request,
+    response: Response,
     query_params: QueryParams = Depends(),
     db: AsyncSession = Depends(get_db)
 ) -> ProductsResponse:
-    query = select(Product)
-    
-    # Фильтры
-    if query_params.filter:
-        try:
-            filters_dict = json.loads(query_params.filter)
-            filters = [
-                getattr(Product.c, field) == value
-                for field, value in filters_dict.items()
-                if hasattr(Product.c, field)
-            ]
-            if filters:
-                query = query.where(and_(*filters))
-        except json.JSONDecodeError:
-            return JSONResponse(content={"detail": "Invalid filter format. Please provide a valid JSON string."}, status_code=400)
-
-    # Поиск
+    key = f"products:{make_key(query_params)}"
+    version = await catalog_cache.version()
+    etag = catalog_etag(version, key)
+    headers = cache_headers("products", etag)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
     if query_params.search:
-        search_filter = or_(
-            Product.c.name.ilike(f"%{query_params.search}%"),
-            Product.c.description.ilike(f"%{query_params.search}%")
-        )
-        query = query.where(search_filter)
-
-    # Сортировка
-    if query_params.sort_by and hasattr(Product.c, query_params.sort_by):
-        order_by_column = getattr(Product.c, query_params.sort_by)
-        query = query.order_by(asc(order_by_column) if query_params.order == "asc" else desc(order_by_column))
-    
-    # Пагинация
-    offset = (query_params.page - 1) * query_params.page_size
-    query = query.offset(offset).limit(query_params.page_size)
+        await load_search_index(db, version)
+    query = product_query.apply(select(Product), query_params)
+
+    # Сортировка и пагинация
+    query, sort_column = product_query.paginate(query, query_params)
     
-    # Выполнение запроса
-    result = await db.execute(query)
-    products_list = [
-        {
+    # Выполнение запроса (через кеш каталога)
+    async def load():
+        result = await db.execute(query)
+        rows, next_cursor, prev_cursor = page_cursors(result.fetchall(), sort_column, query_params)
+        products_list = [
+            {
+                'id': product.id,
+                'name': product.name,
+                'price': product.price,
+                'description': product.description,
+                'category_id': product.category_id,
+                'is_available': product.is_available
+            }
+            for product in rows
+        ]
+        return {"data": products_list, "next_cursor": next_cursor, "prev_cursor": prev_cursor}
+
+    page = await get_catalog(key, load, version)
+
+    return trusted_response(page, response)
+
+@router.get("/products/export")
+async def export_products(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    query_params: QueryParams = Depends(),
+    payload=Depends(check_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    # Те же фильтры, поиск и сортировка, что у /products, но без страниц
+    if query_params.search:
+        await load_search_index(db)
+    query = product_query.apply(select(Product), query_params)
+    query = product_query.sort(query, query_params)
+
+    return stream_export(query, "products", fmt)
+
+
+@router.get("/product/{id}", response_model=Products)
+async def product(
+    id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+) -> Products:
+    key = f"product:{id}"
+    version = await catalog_cache.version()
+    etag = catalog_etag(version, key)
+    headers = cache_headers("product", etag)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+    async def load():
+        product = await get_product_by_id(id, db)
+        return {
             'id': product.id,
             'name': product.name,
             'price': product.price,
@@ -87,25 +169,10 @@ async def products(
             'category_id': product.category_id,
             'is_available': product.is_available
         }
-        for product in result.fetchall()
-    ]
-    
-    return ProductsResponse(data=products_list)
 
-@router.get("/product/{id}", response_model=Products)
-async def product(
-    id: int,
-    db: AsyncSession = Depends(get_db)
-) -> Products:
-    
-    product = await get_product_by_id(id, db)
+    product = await get_catalog(key, load, version)
 
-    return Products(id=product.id, 
-                    name=product.name, 
-                    price=product.price, 
-                    description=product.description, 
-                    category_id=product.category_id, 
-                    is_available=product.is_available)
+    return trusted_response(product, response)
 
 @router.put("/product/{id}", response_model=ProductsUpdateResponse)
 async def update_product_put(
@@ -137,6 +204,8 @@ async def update_product_put(
                 detail="Internal Server Error: Could not update product"
             )
     
+    await catalog_cache.bump_version()
+
     return ProductsUpdateResponse(status=True, data=put_product)
 
 @router.patch("/product/{id}", response_model=ProductsUpdateResponsePatch)
@@ -177,6 +246,8 @@ async def update_product_patch(
                 status_code=500,
                 detail="Internal Server Error: Could not update product"
             )    
+    await catalog_cache.bump_version()
+
     return ProductsUpdateResponsePatch(status=True, data=update_data)
 
 @router.delete("/product/{id}", response_model=ProductsDeleteResponse)
@@ -201,6 +272,8 @@ async def delete_product(
                 detail="Internal Server Error: Could not delete product"
             )
 
+    await catalog_cache.bump_version()
+
     return ProductsDeleteResponse(
         status=True,
         message="Product deleted"
@@ -1,13 +1,16 @@
-from sqlalchemy import Table, Column, Integer, String, ForeignKey, Boolean, JSON, Text
+from sqlalchemy import Index, Table, Column, Integer, String, ForeignKey, Boolean, JSON, Text
 from models import metadata
 
 Product = Table(
     "product",
     metadata,
     Column("id", Integer, primary_key=True),
-    Column("name", String, nullable=False),
-    Column("price", Integer, nullable=True),
-    Column("category_id", Integer, ForeignKey("category.id")),
+    Column("name", String, nullable=False, index=True),
+    Column("price", Integer, nullable=True, index=True),
+    Column("category_id", Integer, ForeignKey("category.id"), index=True),
     Column("description", Text, nullable=True),
-    Column("is_available", Boolean, nullable=False, default=True),
+    Column("is_available", Boolean, nullable=False, default=True, index=True),
+    # Триграммные индексы для поиска ILIKE '%...%' (расширение pg_trgm)
+    Index("ix_product_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    Index("ix_product_description_trgm", "description", postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}),
 )
\ No newline at end of file
@@ -1,6 +1,7 @@
 from typing import List, Optional
 from fastapi import Query
 from pydantic import BaseModel
+from query_engine import ListQueryParams
 
 class ProductCreate(BaseModel):
     name: str
@@ -23,6 +24,8 @@ class Products(BaseModel):
 
 class ProductsResponse(BaseModel):
     data: List[Products]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 class ProductsDeleteResponse(BaseModel):
     status: bool
@@ -52,10 +55,46 @@ class ProductsUpdateResponsePatch(BaseModel):
     status: bool
     data: ProductsUpdatePatch
 
-class QueryParams(BaseModel):
-    sort_by: Optional[str] = None  # Поле для сортировки
-    order: Optional[str] = "asc"  # Порядок сортировки: asc (по возрастанию) или desc (по убыванию)
-    search: Optional[str] = None  # Поиск по тексту
-    filter: Optional[str] = None
-    page: int = 1  # Номер страницы
-    page_size: int = 10  # Количество записей на странице
+class QueryParams(ListQueryParams):
+    pass
+
+
+class ProductImportRow(BaseModel):
+    id: Optional[int] = None  # Есть id — обновление товара, нет — новый товар
+    name: str
+    price: int
+    description: Optional[str] = None
+    category_id: int
+    is_available: bool = True
+
+# Тело импорта читается из Request, поэтому форматы описываются для OpenAPI вручную
+PRODUCT_IMPORT_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {"type": "array", "items": ProductImportRow.model_json_schema()},
+            },
+            "text/csv": {
+                "schema": {"type": "string", "description": "CSV с заголовком: " + ",".join(ProductImportRow.model_fields)},
+            },
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                },
+            },
+        },
+    },
+}
+
+class ProductImportError(BaseModel):
+    row: int  # Номер строки в файле (с 1, без заголовка CSV)
+    detail: str
+
+class ProductImportResponse(BaseModel):
+    status: bool
+    inserted: int
+    updated: int
+    errors: List[ProductImportError]
\ No newline at end of file
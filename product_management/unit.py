@@ -1,7 +1,17 @@
+import csv
+import io
+from pydantic import ValidationError
+from sqlalchemy import Boolean, Integer, String, Text, column, func, insert, table, text, update
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
+from cache import catalog_cache, get_catalog
+from categories_management.models import Category
+from config import PRODUCT_IMPORT_MAX_ROWS, SEARCH_BACKEND
 from product_management.models import Product
+from product_management.schemas import ProductImportRow
+from query_engine import QueryEngine
+from search_index import TrigramIndex
 
 
 async def get_product_by_id(id: int, db: AsyncSession):
@@ -9,4 +19,180 @@ async def get_product_by_id(id: int, db: AsyncSession):
     product = result.fetchone()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    return product
\ No newline at end of file
+    return product
+
+
+product_search_index = TrigramIndex()
+
+
+async def load_search_index(db: AsyncSession, version: int = None):
+    # Индекс в памяти (SEARCH_BACKEND=memory) перестраивается, когда
+    # запись в каталог меняет его версию
+    if SEARCH_BACKEND != "memory":
+        return
+    if version is None:
+        version = await catalog_cache.version()
+    if product_search_index.version != version:
+        result = await db.execute(select(Product.c.id, Product.c.name, Product.c.description))
+        product_search_index.rebuild(result.fetchall(), version)
+
+
+def search_rank(search: str):
+    if SEARCH_BACKEND == "memory":
+        return product_search_index.rank(search, Product.c.id)
+    # Релевантность по триграммам: лучшее совпадение по названию или описанию
+    return func.greatest(
+        func.word_similarity(search, Product.c.name),
+        func.word_similarity(search, Product.c.description),
+    )
+
+
+product_query = QueryEngine(
+    Product,
+    search=("name", "description"),
+    filterable=("id", "name", "price", "category_id", "is_available"),
+    sortable=("name", "price", "category_id"),
+    rank=search_rank
+)
+
+
+async def get_available_product_ids(db: AsyncSession) -> set:
+    # Снимок доступных товаров из кеша каталога; сбрасывается вместе с ним
+    async def load():
+        result = await db.execute(select(Product.c.id).where(Product.c.is_available == True))
+        return list(result.scalars().all())
+
+    return set(await get_catalog("available_ids", load))
+
+
+
+IMPORT_COLUMNS = ["row_number", "id", "name", "price", "description", "category_id", "is_available"]
+
+# Временная таблица для импорта; удаляется при коммите транзакции
+ProductImport = table(
+    "product_import",
+    column("row_number", Integer),
+    column("id", Integer),
+    column("name", String),
+    column("price", Integer),
+    column("description", Text),
+    column("category_id", Integer),
+    column("is_available", Boolean),
+)
+
+
+async def read_import_rows(request: Request) -> list:
+    """Строки импорта из JSON-массива, тела text/csv или файла в multipart (поле file)."""
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="CSV file is required in field 'file'")
+        raw = (await upload.read()).decode("utf-8-sig")
+        rows = list(csv.DictReader(io.StringIO(raw)))
+    elif content_type.startswith("text/csv"):
+        raw = (await request.body()).decode("utf-8-sig")
+        rows = list(csv.DictReader(io.StringIO(raw)))
+    else:
+        try:
+            rows = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of products")
+
+    if not rows:
+        raise HTTPException(status_code=400, detail="No rows to import")
+    if len(rows) > PRODUCT_IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"Too many rows: {len(rows)} > {PRODUCT_IMPORT_MAX_ROWS}")
+    return rows
+
+
+def parse_import_rows(rows: list):
+    """Проверяет строки по схеме; возвращает валидные строки и ошибки по номерам строк."""
+    valid, errors = [], []
+    for number, raw in enumerate(rows, start=1):
+        if not isinstance(raw, dict):
+            errors.append({"row": number, "detail": "Expected an object"})
+            continue
+        # Пустая ячейка CSV означает отсутствие значения
+        raw = {key: value for key, value in raw.items() if key and value != ""}
+        try:
+            valid.append((number, ProductImportRow(**raw)))
+        except ValidationError as e:
+            detail = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+            errors.append({"row": number, "detail": detail})
+    return valid, errors
+
+
+async def check_import_rows(valid: list, db: AsyncSession):
+    """
+    Отбрасывает строки с несуществующей категорией или товаром и
+    повторяющимся id. Категории и товары проверяются одним запросом каждые.
+    """
+    category_ids = {row.category_id for _, row in valid}
+    product_ids = {row.id for _, row in valid if row.id is not None}
+
+    result = await db.execute(select(Category.c.id).where(Category.c.id.in_(category_ids)))
+    known_categories = set(result.scalars().all())
+    known_products = set()
+    if product_ids:
+        result = await db.execute(select(Product.c.id).where(Product.c.id.in_(product_ids)))
+        known_products = set(result.scalars().all())
+
+    checked, errors, seen = [], [], set()
+    for number, row in valid:
+        if row.category_id not in known_categories:
+            errors.append({"row": number, "detail": f"Category with id {row.category_id} not found"})
+        elif row.id is not None and row.id not in known_products:
+            errors.append({"row": number, "detail": f"Product with id {row.id} not found"})
+        elif row.id is not None and row.id in seen:
+            errors.append({"row": number, "detail": f"Duplicate product id {row.id}"})
+        else:
+            seen.add(row.id)
+            checked.append((number, row))
+    return checked, errors
+
+
+async def import_products(rows: list, db: AsyncSession):
+    """
+    Загружает строки через COPY во временную таблицу и сливает их в
+    product двумя запросами: UPDATE ... FROM для строк с id и
+    INSERT ... SELECT для новых. Вызывается внутри транзакции.
+    Возвращает число добавленных и обновлённых товаров.
+    """
+    await db.execute(text(
+        "CREATE TEMP TABLE product_import ("
+        "row_number integer, id integer, name text, price integer, "
+        "description text, category_id integer, is_available boolean"
+        ") ON COMMIT DROP"
+    ))
+
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        "product_import",
+        records=[
+            (number, row.id, row.name, row.price, row.description, row.category_id, row.is_available)
+            for number, row in rows
+        ],
+        columns=IMPORT_COLUMNS
+    )
+
+    fields = ["name", "price", "description", "category_id", "is_available"]
+    updated = await db.execute(
+        update(Product)
+        .values({field: ProductImport.c[field] for field in fields})
+        .where(Product.c.id == ProductImport.c.id)
+    )
+    inserted = await db.execute(
+        insert(Product).from_select(
+            fields,
+            select(*[ProductImport.c[field] for field in fields])
+            .where(ProductImport.c.id.is_(None))
+            .order_by(ProductImport.c.row_number)
+        )
+    )
+    return inserted.rowcount, updated.rowcount
\ No newline at end of file
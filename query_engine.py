@@ -0,0 +1,166 @@
+import json
+from datetime import date, datetime
+from typing import Optional
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import BigInteger, Integer, String, and_, desc, or_
+from pagination import paginate, sort_query
+
+
+class ListQueryParams(BaseModel):
+    sort_by: Optional[str] = None  # Поле для сортировки
+    order: Optional[str] = "asc"  # Порядок сортировки: asc (по возрастанию) или desc (по убыванию)
+    search: Optional[str] = None  # Поиск по тексту
+    filter: Optional[str] = None  # Фильтры в JSON: {"field": value} или {"field": {"gte": 1, "lte": 5}}
+    page: int = 1  # Номер страницы
+    page_size: int = 10  # Количество записей на странице
+    after: Optional[str] = None  # Курсор: записи после указанной
+    before: Optional[str] = None  # Курсор: записи до указанной
+
+
+INT4_MIN, INT4_MAX = -2**31, 2**31 - 1
+
+# Операторы фильтра; значение {"field": value} означает eq
+OPERATORS = {
+    "eq": lambda column, value: column == value,
+    "gte": lambda column, value: column >= value,
+    "lte": lambda column, value: column <= value,
+    "in": lambda column, value: column.in_(value),
+    "prefix": lambda column, value: column.startswith(value, autoescape=True),
+}
+
+
+def _coerce(column, value):
+    # Значение из JSON приводится к типу колонки: строка в числовом или
+    # логическом фильтре иначе дошла бы до asyncpg и вернулась ошибкой 500
+    if value is None:
+        return value
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+
+    try:
+        value = _convert(value, python_type)
+    except (ValueError, TypeError, OverflowError):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid value in filter for '{column.name}': expected {python_type.__name__}, got {value!r}"
+        )
+
+    # Integer в PostgreSQL — 4 байта
+    int4 = isinstance(column.type, Integer) and not isinstance(column.type, BigInteger)
+    if int4 and not INT4_MIN <= value <= INT4_MAX:
+        raise HTTPException(status_code=400, detail=f"Value in filter for '{column.name}' is out of range: {value}")
+    return value
+
+
+def _convert(value, python_type):
+    if python_type in (datetime, date):
+        if not isinstance(value, str):
+            raise TypeError("expected ISO date string")
+        return python_type.fromisoformat(value)
+    if python_type is bool:
+        if not isinstance(value, bool):
+            raise TypeError("expected true or false")
+        return value
+    if python_type is int:
+        if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+            raise TypeError("expected integer")
+        return int(value)
+    if python_type is str:
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise TypeError("expected string")
+        return str(value)
+    return value
+
+
+class QueryEngine:
+    """
+    Фильтры, поиск, сортировка и пагинация списков по настройкам таблицы.
+
+    Фильтровать и сортировать можно только по колонкам из белых списков
+    (у каждой есть B-tree индекс, это проверяет tests/test_indexes.py),
+    колонки разрешаются один раз при создании. Значения фильтров
+    приводятся к типу колонки и всегда передаются параметрами, поэтому запросы одной формы
+    переиспользуют скомпилированный SQL из кеша SQLAlchemy и
+    подготовленные выражения asyncpg.
+    """
+
+    def __init__(self, table, search=(), filterable=(), sortable=(), rank=None):
+        self.table = table
+        self.search_columns = [table.c[name] for name in search]
+        self.filter_columns = {name: table.c[name] for name in filterable}
+        sortable = set(sortable) | {"id"}
+        self.unsortable = tuple(column.name for column in table.c if column.name not in sortable)
+        # rank(search) — выражение релевантности для сортировки результатов поиска
+        self.rank = rank
+
+    def parse_filters(self, raw: str) -> list:
+        try:
+            filters_dict = json.loads(raw)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Invalid filter format. Please provide a valid JSON string.")
+        if not isinstance(filters_dict, dict):
+            raise HTTPException(status_code=400, detail="Invalid filter format. Please provide a valid JSON string.")
+
+        conditions = []
+        for field, condition in filters_dict.items():
+            column = self.filter_columns.get(field)
+            if column is None:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Filtering by '{field}' is not allowed. Allowed fields: {sorted(self.filter_columns)}"
+                )
+
+            if not isinstance(condition, dict):
+                condition = {"eq": condition}
+            for operator, value in condition.items():
+                build = OPERATORS.get(operator)
+                if build is None:
+                    raise HTTPException(status_code=400, detail=f"Unknown filter operator '{operator}'. Allowed: {sorted(OPERATORS)}")
+                if operator == "in":
+                    if not isinstance(value, list):
+                        raise HTTPException(status_code=400, detail=f"Filter 'in' for '{field}' expects a list")
+                    value = [_coerce(column, item) for item in value]
+                elif operator == "prefix" and (not isinstance(value, str) or not isinstance(column.type, String)):
+                    raise HTTPException(status_code=400, detail=f"Filter 'prefix' for '{field}' expects a string column and value")
+                else:
+                    value = _coerce(column, value)
+                conditions.append(build(column, value))
+        return conditions
+
+    def apply(self, query, query_params):
+        """Фильтры и поиск (общие для списка и выгрузки)."""
+        if query_params.filter:
+            conditions = self.parse_filters(query_params.filter)
+            if conditions:
+                query = query.where(and_(*conditions))
+
+        if query_params.search and self.search_columns:
+            query = query.where(or_(*[column.ilike(f"%{query_params.search}%") for column in self.search_columns]))
+
+            if self.is_ranked(query_params):
+                query = query.order_by(desc(self.rank(query_params.search)))
+        return query
+
+    def is_ranked(self, query_params) -> bool:
+        # Без явной сортировки результаты поиска выдаются по релевантности
+        return bool(self.rank is not None and self.search_columns and query_params.search and not query_params.sort_by)
+
+    def paginate(self, query, query_params):
+        if self.is_ranked(query_params):
+            # Релевантность вычисляется в запросе и не годится в ключ
+            # курсора, поэтому результаты поиска листаются по номеру
+            # страницы (порядок rank, id), а курсоры не выдаются
+            if query_params.after or query_params.before:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Cursors are not supported for ranked search results. Use 'page' or set 'sort_by'"
+                )
+            query, _ = paginate(query, self.table, query_params, unsortable=self.unsortable)
+            return query, None
+        return paginate(query, self.table, query_params, unsortable=self.unsortable)
+
+    def sort(self, query, query_params):
+        return sort_query(query, self.table, query_params, unsortable=self.unsortable)
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""
+Триграммный поиск в памяти процесса — запасное ранжирование для тестов и
+баз без pg_trgm (SEARCH_BACKEND=memory). Оценка повторяет word_similarity
+из pg_trgm: наибольшее сходство множества триграмм запроса с непрерывным
+отрезком триграмм текста.
+"""
+import re
+from sqlalchemy import case, literal
+
+WORD = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: str) -> list:
+    # Как в pg_trgm: слова в нижнем регистре, два пробела слева и один справа
+    result = []
+    for word in WORD.findall(text.lower()):
+        padded = f"  {word} "
+        result.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def word_similarity(search: str, text: str) -> float:
+    needle = set(trigrams(search))
+    haystack = trigrams(text or "")
+    if not needle or not haystack:
+        return 0.0
+
+    # Отрезок выгодно начинать и заканчивать на общей триграмме:
+    # лишние триграммы по краям только уменьшают сходство
+    best = 0.0
+    for start, trigram in enumerate(haystack):
+        if trigram not in needle:
+            continue
+        extent, common = set(), 0
+        for current in haystack[start:]:
+            if current not in extent:
+                extent.add(current)
+                common += current in needle
+            if current in needle:
+                best = max(best, common / (len(needle) + len(extent) - common))
+    return best
+
+
+class TrigramIndex:
+    """Тексты строк по id; перестраивается целиком при смене версии каталога."""
+
+    def __init__(self):
+        self.version = None
+        self._rows = {}
+
+    def rebuild(self, rows, version):
+        # rows — кортежи (id, текст, ...); NULL-тексты пропускаются
+        self._rows = {row[0]: [text.lower() for text in row[1:] if text] for row in rows}
+        self.version = version
+
+    def scores(self, search: str) -> dict:
+        # Оцениваются только строки, которые найдёт ILIKE '%search%'
+        needle = search.lower()
+        return {
+            row_id: max(word_similarity(needle, text) for text in texts)
+            for row_id, texts in self._rows.items()
+            if any(needle in text for text in texts)
+        }
+
+    def rank(self, search: str, id_column):
+        # Оценки из индекса как выражение для ORDER BY
+        scores = self.scores(search)
+        if not scores:
+            return literal(0.0)
+        return case(scores, value=id_column, else_=0.0)
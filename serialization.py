@@ -0,0 +1,21 @@
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from config import TRUSTED_RESPONSES
+
+
+def trusted_response(content, response: Response = None):
+    """
+    Ответ из данных, уже имеющих форму response_model (строки из БД).
+
+    FastAPI не валидирует возвращённый Response, поэтому содержимое
+    сразу сериализуется orjson. Заголовки, выставленные обработчиком
+    через response, переносятся в ответ. При TRUSTED_RESPONSES=false
+    данные возвращаются как есть и проходят обычную валидацию.
+    """
+    if not TRUSTED_RESPONSES:
+        return content
+
+    headers = None
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return ORJSONResponse(content, headers=headers)
\ No newline at end of file
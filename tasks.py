@@ -1,37 +1,159 @@
-from celery_worker import app 
-from sqlalchemy import create_engine, Table, MetaData
+import asyncio
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from celery.utils.log import get_task_logger
+from celery_worker import app
+from sqlalchemy import create_engine, delete, func, or_, select, text, update
 from sqlalchemy.orm import sessionmaker
-from config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER
+from config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER, CLEANUP_BATCH_SIZE, OUTBOX_BATCH_SIZE, OUTBOX_MAX_ATTEMPTS, OUTBOX_RETRY_BASE_SECONDS, OUTBOX_RETRY_MAX_SECONDS, UNVERIFIED_USER_TTL_HOURS
+from auth.models import User, Verif_code
+from cart.models import Cart
+from cart.store import cart_store
+from cache import close_redis
+from order_management.models import EmailOutbox, Order, OrderItems
+from mailer import build_message, is_permanent
+from order_management.send_email import send_messages
 
 
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(DATABASE_URL)
-metadata = MetaData()
-Session = sessionmaker(bind=engine)
+logger = get_task_logger(__name__)
 
-User = Table(
-    "user", metadata,
-    autoload_with=engine 
-)
 
-@app.task
-def delete_unverified_users():
-    session = Session()
+@lru_cache(maxsize=None)
+def get_session_factory():
+    # Синхронный движок нужен только воркеру Celery, поэтому создаётся
+    # при первом вызове задачи, а не при импорте модуля
+    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    return sessionmaker(bind=engine)
 
-    try:
-        stmt = User.select().where(User.c.is_verified == False)
-        users_to_delete = session.execute(stmt).fetchall()
 
-        for user in users_to_delete:
-            delete_stmt = User.delete().where(User.c.id == user.id)
-            session.execute(delete_stmt)
+def delete_users_batch(session, cutoff: datetime, batch_size: int) -> list:
+    # Пачка пользователей блокируется, параллельный запуск возьмёт следующую.
+    # Возвращает id удалённых пользователей
+    user_ids = session.execute(
+        select(User.c.id)
+        .where(User.c.is_verified == False, User.c.created_at < cutoff)
+        .order_by(User.c.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
 
-        session.commit()
-        print(f"Удалены {len(users_to_delete)} не верифицированные пользователи")
+    if not user_ids:
+        return []
+
+    # Сначала зависимые строки, затем сами пользователи
+    order_ids = select(Order.c.id).where(Order.c.user_id.in_(user_ids))
+    session.execute(delete(OrderItems).where(OrderItems.c.order_id.in_(order_ids)))
+    session.execute(delete(Order).where(Order.c.user_id.in_(user_ids)))
+    session.execute(delete(Cart).where(Cart.c.user_id.in_(user_ids)))
+    session.execute(delete(Verif_code).where(Verif_code.c.user_id.in_(user_ids)))
+    session.execute(delete(User).where(User.c.id.in_(user_ids)))
+    return list(user_ids)
 
-    except Exception as e:
-        session.rollback()
-        print(f"Ошибка при удалении пользователей: {e}")
+
+async def clear_carts(user_ids: list):
+    # Корзины вне Postgres (Redis) не удаляются вместе со строками cart;
+    # если Redis недоступен, они истекут через CART_TTL_DAYS. Клиент Redis
+    # привязан к циклу событий, поэтому закрывается в том же asyncio.run
+    try:
+        await asyncio.gather(*(cart_store.clear(user_id, None) for user_id in user_ids))
     finally:
-        session.close()
+        await close_redis()
+
+
+@app.task(bind=True, max_retries=3, default_retry_delay=300)
+def delete_unverified_users(self, batch_size: int = CLEANUP_BATCH_SIZE, ttl_hours: int = UNVERIFIED_USER_TTL_HOURS):
+    Session = get_session_factory()
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=ttl_hours)
+    deleted = 0
+
+    with Session() as session:
+        try:
+            while True:
+                user_ids = delete_users_batch(session, cutoff, batch_size)
+                # Каждая пачка — отдельная короткая транзакция
+                session.commit()
+                if not user_ids:
+                    break
+                if not cart_store.in_database:
+                    asyncio.run(clear_carts(user_ids))
+
+                deleted += len(user_ids)
+                logger.info(f"Удалено {deleted} не верифицированных пользователей")
+
+        except Exception as e:
+            # Удалённые пачки уже закоммичены; повтор продолжит с оставшихся
+            session.rollback()
+            logger.exception(f"Ошибка при удалении пользователей после {deleted} удалённых")
+            raise self.retry(exc=e)
+
+    logger.info(f"Удалены {deleted} не верифицированные пользователи старше {ttl_hours} ч.")
+    return deleted
+
+
+def retry_delay(attempts: int) -> timedelta:
+    # Экспоненциальная пауза: недоступный SMTP не получает письма на каждом запуске задачи
+    return timedelta(seconds=min(OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), OUTBOX_RETRY_MAX_SECONDS))
+
+
+@app.task
+def send_outbox_emails(batch_size: int = OUTBOX_BATCH_SIZE):
+    Session = get_session_factory()
+    sent = 0
+
+    with Session() as session:
+        while True:
+            # Письма пачки блокируются до конца отправки; параллельный
+            # запуск задачи пропустит их и возьмёт следующие
+            emails = session.execute(
+                select(EmailOutbox)
+                .where(
+                    EmailOutbox.c.sent_at.is_(None),
+                    EmailOutbox.c.attempts < OUTBOX_MAX_ATTEMPTS,
+                    or_(EmailOutbox.c.next_attempt_at.is_(None), EmailOutbox.c.next_attempt_at <= func.now())
+                )
+                .order_by(EmailOutbox.c.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            ).fetchall()
+
+            if not emails:
+                session.commit()
+                break
+
+            messages = [build_message(email.recipient, email.subject, email.body) for email in emails]
+            errors = asyncio.run(send_messages(messages))
+
+            for email, error in zip(emails, errors):
+                values = {"attempts": EmailOutbox.c.attempts + 1, "last_error": None if error is None else str(error)}
+                if error is None:
+                    values["sent_at"] = func.now()
+                elif is_permanent(error):
+                    # 5xx и отказ адресата повторять бессмысленно: письмо сразу
+                    # исчерпывает попытки и больше не выбирается (dead letter)
+                    values["attempts"] = func.greatest(EmailOutbox.c.attempts + 1, OUTBOX_MAX_ATTEMPTS)
+                else:
+                    values["next_attempt_at"] = func.now() + retry_delay(email.attempts + 1)
+                session.execute(update(EmailOutbox).where(EmailOutbox.c.id == email.id).values(values))
+            session.commit()
+
+            sent += errors.count(None)
+            if None not in errors:
+                logger.error(f"Не удалось отправить {len(errors)} писем: {errors[0]}")
+                break
+
+    logger.info(f"Отправлено {sent} писем из outbox")
+    return sent
+
+
+
+@app.task
+def refresh_order_daily_revenue():
+    # CONCURRENTLY не блокирует чтение представления на время обновления
+    # (нужен уникальный индекс ix_order_daily_revenue_day_status)
+    Session = get_session_factory()
+    with Session() as session:
+        session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY order_daily_revenue"))
+        session.commit()
+    logger.info("Представление order_daily_revenue обновлено")
\ No newline at end of file
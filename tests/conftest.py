@@ -0,0 +1,253 @@
+"""
+Тесты работают с отдельной базой PostgreSQL: схема создаётся миграциями
+Alembic, данные — loadtest.seed. Подключение задаётся теми же DB_*, что и
+у приложения; имя базы должно оканчиваться на _test, потому что фикстура
+database пересоздаёт схему public. Без такой базы тесты, которым нужна БД
+(через фикстуру database), пропускаются, а остальные выполняются.
+
+    pip install -r requirements-dev.txt
+    DB_NAME=coffee_test python -m pytest
+
+Кеши — в памяти процесса и сбрасываются перед каждым тестом, поэтому
+число запросов к БД проверяется для худшего случая (все промахи).
+"""
+import os
+import random
+import time
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+# До импорта config: тесты не ходят в Redis, а бюджеты проверяют сами
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("CART_BACKEND", "postgres")
+os.environ.setdefault("SECRET", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+# Движок создаётся при импорте database.py и без порта не соберёт URL
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_PORT", "5432")
+os.environ["QUERY_BUDGETS"] = "off"
+# /monitoring/metrics по JWT администратора
+os.environ["METRICS_TOKEN"] = ""
+
+import pytest
+import pytest_asyncio
+from config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER
+
+ROOT = Path(__file__).resolve().parent.parent
+TEST_DATABASE = (DB_NAME or "").endswith("_test")
+
+
+def pytest_report_header(config):
+    if not TEST_DATABASE:
+        return "database tests skipped: set DB_NAME=<name>_test to run them against PostgreSQL"
+
+
+def pytest_collection_modifyitems(items):
+    # Движок и пул соединений общие на процесс, поэтому все тесты
+    # выполняются в одном цикле событий
+    marker = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if pytest_asyncio.is_async_test(item):
+            item.add_marker(marker, append=False)
+
+
+@pytest.fixture(scope="session")
+def database():
+    if not TEST_DATABASE:
+        pytest.skip("needs a PostgreSQL database named *_test (DB_NAME)")
+
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import create_engine, pool, text
+
+    engine = create_engine(
+        f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}",
+        poolclass=pool.NullPool
+    )
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    engine.dispose()
+
+    alembic_config = Config(str(ROOT / "alembic.ini"))
+    alembic_config.set_main_option("script_location", str(ROOT / "migrations"))
+    command.upgrade(alembic_config, "head")
+
+
+@pytest.fixture(scope="session")
+async def seeded(database):
+    from sqlalchemy import select
+    from auth.models import User
+    from database import async_session
+    from loadtest.seed import ADMIN_EMAIL, seed, user_email
+    from product_management.models import Product
+
+    random.seed(1)
+    await seed(categories=5, products=200, users=20, orders=500, password="loadtest")
+
+    async with async_session() as db:
+        result = await db.execute(select(User.c.id, User.c.email).where(User.c.email.in_([ADMIN_EMAIL, user_email(1)])))
+        ids = {user.email: user.id for user in result.fetchall()}
+        result = await db.execute(
+            select(Product.c.id, Product.c.category_id).where(Product.c.is_available == True).order_by(Product.c.id)
+        )
+        products = result.fetchall()
+
+    return SimpleNamespace(
+        admin_id=ids[ADMIN_EMAIL],
+        user_id=ids[user_email(1)],
+        product_ids=[product.id for product in products],
+        category_id=products[0].category_id,
+    )
+
+
+@pytest.fixture(scope="session")
+async def client(seeded):
+    from httpx import ASGITransport, AsyncClient
+    from database import engine
+    from main import app
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    await engine.dispose()
+
+
+async def bearer(user_id: int) -> dict:
+    from auth.jwt_handler import create_access_token
+
+    return {"Authorization": f"Bearer {await create_access_token({'sub': user_id})}"}
+
+
+@pytest.fixture
+def headers_for():
+    return bearer
+
+
+@pytest.fixture(scope="session")
+async def admin_headers(seeded):
+    return await bearer(seeded.admin_id)
+
+
+@pytest.fixture(scope="session")
+async def user_headers(seeded):
+    return await bearer(seeded.user_id)
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    from cache import MemoryBackend, caches
+
+    for cache in caches:
+        cache.backend = MemoryBackend()
+
+
+@pytest.fixture(autouse=True)
+def no_email(request, monkeypatch):
+    # Письма и задачи Celery не отправляются (в тестах с приложением и БД)
+    if "database" not in request.fixturenames:
+        return
+
+    async def skip(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr("auth.auth.send_email", skip)
+    monkeypatch.setattr("order_management.crud.enqueue_outbox_emails", skip)
+
+
+@pytest.fixture
+def budget():
+    """
+    Выполняет запрос и проверяет бюджет маршрута из monitoring/budgets.py:
+
+        response = await budget("GET /product/products", client.get("/product/products"))
+    """
+    from monitoring.budgets import ROUTE_BUDGETS, check_budget
+    from monitoring.instrumentation import count_queries
+
+    async def check(route: str, request):
+        assert route in ROUTE_BUDGETS, f"No budget for {route}"
+        with count_queries() as stats:
+            started = time.perf_counter()
+            response = await request
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+        violations = check_budget(route, stats.queries, elapsed_ms)
+        assert not violations, f"{route}: {', '.join(violations)}\n" + "\n".join(stats.statements)
+        return response
+
+    return check
+
+
+@pytest.fixture
+async def db(database):
+    from database import async_session
+
+    async with async_session() as session:
+        yield session
+
+
+@pytest.fixture
+async def category(db):
+    from categories_management.models import Category
+
+    async with db.begin():
+        result = await db.execute(
+            Category.insert()
+            .values(name=f"Test {uuid.uuid4().hex[:8]}", description="test category", is_active=True)
+            .returning(Category.c.id)
+        )
+    return result.scalar_one()
+
+
+@pytest.fixture
+async def product(db, category):
+    from product_management.models import Product
+
+    async with db.begin():
+        result = await db.execute(
+            Product.insert()
+            .values(name=f"Test {uuid.uuid4().hex[:8]}", price=100, description="test product", category_id=category, is_available=True)
+            .returning(Product.c.id)
+        )
+    return result.scalar_one()
+
+
+@pytest.fixture
+async def new_user(db):
+    from auth.models import User
+
+    async with db.begin():
+        result = await db.execute(
+            User.insert()
+            .values(email=f"test-{uuid.uuid4().hex[:8]}@example.com", role_id=1, hashed_password="x", is_verified=True)
+            .returning(User.c.id)
+        )
+    return result.scalar_one()
+
+
+@pytest.fixture
+async def order(db, seeded, product):
+    from order_management.models import Order, OrderItems
+
+    async with db.begin():
+        result = await db.execute(
+            Order.insert().values(user_id=seeded.user_id, total_price=200, status="Ожидает").returning(Order.c.id)
+        )
+        order_id = result.scalar_one()
+        await db.execute(OrderItems.insert().values(order_id=order_id, product_id=product, quantity=2, price=100))
+    return order_id
+
+
+@pytest.fixture
+async def empty_cart(seeded):
+    from cart.store import cart_store
+    from database import async_session
+
+    async with async_session() as db:
+        async with db.begin():
+            await cart_store.clear(seeded.user_id, db)
+    yield
+    async with async_session() as db:
+        async with db.begin():
+            await cart_store.clear(seeded.user_id, db)
@@ -0,0 +1,84 @@
+import uuid
+from auth.jwt_handler import create_refresh_token
+from auth.models import Verif_code
+
+
+async def test_registration(client, budget):
+    response = await budget("POST /auth/registration", client.post("/auth/registration", json={
+        "username": "tester",
+        "first_name": "Test",
+        "last_name": "User",
+        "email": f"test-{uuid.uuid4().hex[:8]}@example.com",
+        "password": "secret123",
+    }))
+    assert response.status_code == 200
+    assert response.json()["user_id"]
+
+
+async def test_authentication(client, budget):
+    response = await budget("POST /auth/authentication", client.post("/auth/authentication", json={
+        "email": "loadtest-user-1@example.com",
+        "password": "loadtest",
+    }))
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+
+
+async def test_access(client, budget, seeded):
+    refresh_token = await create_refresh_token({"sub": seeded.user_id})
+    response = await budget("POST /auth/access", client.post("/auth/access", params={"refresh_token": refresh_token}))
+    assert response.status_code == 200
+    assert response.json()["access_token"]
+
+
+async def test_refresh(client, budget, seeded):
+    refresh_token = await create_refresh_token({"sub": seeded.user_id})
+    response = await budget("POST /auth/refresh", client.post("/auth/refresh", params={"refresh_token": refresh_token}))
+    assert response.status_code == 200
+    assert response.json()["refresh_token"]
+
+
+async def test_verification(client, budget, db, new_user, headers_for):
+    async with db.begin():
+        await db.execute(Verif_code.insert().values(user_id=new_user, code=123456))
+
+    response = await budget("POST /auth/verification", client.post(
+        "/auth/verification", json={"verification_code": 123456}, headers=await headers_for(new_user)
+    ))
+    assert response.status_code == 200
+    assert response.json()["status"] is True
+
+
+async def test_hash_pool_limits_concurrency():
+    import asyncio
+    import threading
+    import time
+    from auth.unit import hash_executor, hash_pool_stats, run_in_hash_pool
+
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def work():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+
+    completed = hash_pool_stats["completed"]
+    await asyncio.gather(*(run_in_hash_pool(work) for _ in range(hash_executor._max_workers * 3)))
+
+    assert peak[0] <= hash_pool_stats["concurrency"]
+    assert hash_pool_stats["completed"] - completed == hash_executor._max_workers * 3
+    assert hash_pool_stats["waiting"] == 0 and hash_pool_stats["running"] == 0
+
+
+async def test_authenticate_user_keeps_caller_transaction(db):
+    from sqlalchemy import text
+    from auth.unit import authenticate_user
+
+    async with db.begin():
+        await db.execute(text("CREATE TEMP TABLE auth_probe (id int) ON COMMIT DROP"))
+        await authenticate_user("loadtest-user-1@example.com", "wrong-password", db)
+        # Временная таблица видна, значит транзакцию не откатили
+        await db.execute(text("INSERT INTO auth_probe VALUES (1)"))
@@ -0,0 +1,51 @@
+import asyncio
+from cache import Cache, MemoryBackend
+
+
+class ForgetfulBackend(MemoryBackend):
+    """Не сохраняет значения: каждый вызов под блокировкой загружает заново."""
+
+    async def set(self, key: str, value, ttl: int):
+        pass
+
+
+async def test_get_or_load_single_flight():
+    cache = Cache("test-single-flight", ttl=60, backend=MemoryBackend())
+    loads = 0
+
+    async def loader():
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0.01)
+        return {"value": 1}
+
+    results = await asyncio.gather(*(cache.get_or_load("key", loader) for _ in range(10)))
+
+    assert loads == 1
+    assert results == [{"value": 1}] * 10
+    assert cache._locks == {} and cache._lock_users == {}
+
+
+async def test_get_or_load_keeps_lock_while_waiters_queued():
+    cache = Cache("test-lock-waiters", ttl=60, backend=ForgetfulBackend())
+    running = peak = 0
+    first_done = asyncio.Event()
+
+    async def loader():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        first_done.set()
+        return 1
+
+    async def late_caller():
+        # Приходит, когда первая загрузка закончилась, а ожидающие ещё в очереди
+        await first_done.wait()
+        return await cache.get_or_load("key", loader)
+
+    await asyncio.gather(*(cache.get_or_load("key", loader) for _ in range(3)), late_caller())
+
+    assert peak == 1
+    assert cache._locks == {} and cache._lock_users == {}
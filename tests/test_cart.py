@@ -0,0 +1,123 @@
+import pytest
+from sqlalchemy import select
+from cart.models import Cart
+
+
+async def test_add_to_cart(client, budget, user_headers, seeded, empty_cart):
+    response = await budget("POST /cart/cart", client.post(
+        "/cart/cart", json={"product_id": seeded.product_ids[0], "quantity": 1}, headers=user_headers
+    ))
+    assert response.status_code == 200
+
+
+async def test_add_to_cart_batch(client, budget, user_headers, seeded, empty_cart):
+    items = [{"product_id": product_id, "quantity": 1} for product_id in seeded.product_ids[:5]]
+    response = await budget("POST /cart/cart/batch", client.post("/cart/cart/batch", json={"items": items}, headers=user_headers))
+    assert response.status_code == 200
+
+
+async def test_delete_item_from_cart(client, budget, user_headers, seeded, db, empty_cart):
+    await client.post("/cart/cart", json={"product_id": seeded.product_ids[0], "quantity": 1}, headers=user_headers)
+    result = await db.execute(select(Cart.c.id).where(Cart.c.user_id == seeded.user_id))
+    item_id = result.scalar_one()
+    await db.rollback()
+
+    response = await budget("DELETE /cart/cart/{id}", client.delete(f"/cart/cart/{item_id}", headers=user_headers))
+    assert response.status_code == 200
+
+
+async def test_clear_cart(client, budget, user_headers, seeded, empty_cart):
+    await client.post("/cart/cart", json={"product_id": seeded.product_ids[0], "quantity": 1}, headers=user_headers)
+
+    response = await budget("DELETE /cart/cart", client.delete("/cart/cart", headers=user_headers))
+    assert response.status_code == 200
+
+
+async def test_repeated_adds_keep_one_row_per_product(client, user_headers, seeded, db, empty_cart):
+    first, second = seeded.product_ids[:2]
+    for _ in range(5):
+        await client.post("/cart/cart", json={"product_id": first, "quantity": 1}, headers=user_headers)
+    await client.post("/cart/cart/batch", json={"items": [
+        {"product_id": first, "quantity": 2},
+        {"product_id": second, "quantity": 1},
+        {"product_id": second, "quantity": 3},
+    ]}, headers=user_headers)
+
+    result = await db.execute(select(Cart.c.product_id, Cart.c.quantity).where(Cart.c.user_id == seeded.user_id))
+    assert dict(result.fetchall()) == {first: 7, second: 4}
+    await db.rollback()
+
+
+async def test_batch_size_is_limited(client, user_headers, seeded, empty_cart):
+    from config import CART_BATCH_MAX_ITEMS
+
+    items = [{"product_id": seeded.product_ids[0], "quantity": 1}] * (CART_BATCH_MAX_ITEMS + 1)
+    response = await client.post("/cart/cart/batch", json={"items": items}, headers=user_headers)
+    assert response.status_code == 422
+
+
+async def test_checkout_claims_cart_and_restores_on_failure():
+    from fastapi import HTTPException
+    from cart.store import MemoryCartStore
+
+    store = MemoryCartStore()
+    await store._increment(1, {10: 2})
+    token, claimed = await store._claim(1)
+    assert claimed == {10: 2}
+
+    # Пока идёт оформление, второй checkout не забирает ту же корзину,
+    # а новые товары попадают в новую корзину
+    with pytest.raises(HTTPException) as error:
+        await store._claim(1)
+    assert error.value.status_code == 409
+    await store._increment(1, {10: 1, 11: 1})
+
+    await store.checkout_failed(1, token)
+    assert await store._quantities(1) == {10: 3, 11: 1}
+
+    token, claimed = await store._claim(1)
+    assert claimed == {10: 3, 11: 1}
+    await store.checkout_confirm(1, token)
+    await store.checkout_done(1, token)
+    assert await store._quantities(1) == {}
+    assert (await store._claim(1))[1] == {}
+
+
+async def test_abandoned_checkout_returns_to_cart():
+    # Процесс упал посередине оформления: по истечении CART_CHECKOUT_TTL
+    # товары снова в корзине, а не потеряны
+    from cart.store import MemoryCartStore
+
+    store = MemoryCartStore()
+    store.checkout_ttl = 0
+    await store._increment(1, {10: 2})
+    await store._claim(1)
+    await store._increment(1, {11: 1})
+
+    assert await store._quantities(1) == {10: 2, 11: 1}
+
+
+async def test_expired_checkout_is_not_committed():
+    # Медленное оформление потеряло блокировку, и корзину забрало другое:
+    # первое не проходит checkout_confirm и не возвращает чужие товары
+    from fastapi import HTTPException
+    from cart.store import MemoryCartStore
+
+    store = MemoryCartStore()
+    store.checkout_ttl = 0
+    await store._increment(1, {10: 2})
+    slow, _ = await store._claim(1)
+
+    store.checkout_ttl = 300
+    fast, claimed = await store._claim(1)
+    assert claimed == {10: 2}
+
+    with pytest.raises(HTTPException) as error:
+        await store.checkout_confirm(1, slow)
+    assert error.value.status_code == 409
+    await store.checkout_failed(1, slow)
+    assert await store._quantities(1) == {}
+
+    await store.checkout_confirm(1, fast)
+    await store.checkout_done(1, fast)
+    assert await store._quantities(1) == {}
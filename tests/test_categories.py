@@ -0,0 +1,36 @@
+async def test_add_category(client, budget, admin_headers):
+    response = await budget("POST /category/category", client.post(
+        "/category/category", json={"name": "Test beans", "description": "test", "is_active": True}, headers=admin_headers
+    ))
+    assert response.status_code == 200
+
+
+async def test_categories(client, budget):
+    response = await budget("GET /category/categories", client.get("/category/categories", params={"page_size": 3}))
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 3
+
+
+async def test_category(client, budget, category):
+    response = await budget("GET /category/category/{id}", client.get(f"/category/category/{category}"))
+    assert response.status_code == 200
+    assert response.json()["id"] == category
+
+
+async def test_update_category_put(client, budget, admin_headers, category):
+    response = await budget("PUT /category/category/{id}", client.put(
+        f"/category/category/{category}", json={"name": "Renamed", "description": "test", "is_active": False}, headers=admin_headers
+    ))
+    assert response.status_code == 200
+
+
+async def test_update_category_patch(client, budget, admin_headers, category):
+    response = await budget("PATCH /category/category/{id}", client.patch(
+        f"/category/category/{category}", json={"is_active": False}, headers=admin_headers
+    ))
+    assert response.status_code == 200
+
+
+async def test_delete_category(client, budget, admin_headers, product, category):
+    response = await budget("DELETE /category/category/{id}", client.delete(f"/category/category/{category}", headers=admin_headers))
+    assert response.status_code == 200
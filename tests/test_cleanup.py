@@ -0,0 +1,124 @@
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import func, insert, literal, select
+from auth.models import User, Verif_code
+from cart.models import Cart
+from order_management.models import Order, OrderItems
+import tasks
+
+# Пользователей в замере очистки; для быстрого прогона можно уменьшить
+CLEANUP_TEST_USERS = int(os.environ.get("CLEANUP_TEST_USERS", 1_000_000))
+
+
+@pytest.fixture
+def session(database):
+    with tasks.get_session_factory()() as session:
+        yield session
+
+
+def add_user(session, verified: bool = False, age: timedelta = timedelta(days=2)) -> int:
+    return session.execute(
+        insert(User)
+        .values(
+            email=f"cleanup-{uuid.uuid4().hex[:8]}@example.com", role_id=1, hashed_password="x",
+            is_verified=verified, created_at=datetime.now(timezone.utc) - age
+        )
+        .returning(User.c.id)
+    ).scalar_one()
+
+
+def test_cleanup_deletes_stale_users_with_dependents(session, seeded, monkeypatch):
+    from cart.store import MemoryCartStore
+
+    product_id = seeded.product_ids[0]
+    stale = [add_user(session) for _ in range(5)]
+    fresh = add_user(session, age=timedelta(hours=1))
+    verified = add_user(session, verified=True)
+    for user_id in stale:
+        session.execute(insert(Verif_code).values(user_id=user_id, code=123456))
+        session.execute(insert(Cart).values(user_id=user_id, product_id=product_id, quantity=1))
+        order_id = session.execute(
+            insert(Order).values(user_id=user_id, total_price=100, status="Ожидает").returning(Order.c.id)
+        ).scalar_one()
+        session.execute(insert(OrderItems).values(order_id=order_id, product_id=product_id, quantity=1, price=100))
+    session.commit()
+
+    # Корзины вне Postgres (как в Redis) удаляются через cart_store
+    carts = MemoryCartStore()
+    for user_id in stale + [fresh]:
+        asyncio.run(carts._increment(user_id, {product_id: 1}))
+    monkeypatch.setattr(tasks, "cart_store", carts)
+
+    batches = []
+    delete_users_batch = tasks.delete_users_batch
+
+    def record(*args):
+        user_ids = delete_users_batch(*args)
+        batches.append(len(user_ids))
+        return user_ids
+
+    monkeypatch.setattr(tasks, "delete_users_batch", record)
+
+    assert tasks.delete_unverified_users(batch_size=2) == 5
+    assert batches == [2, 2, 1, 0]
+
+    users = session.execute(select(User.c.id).where(User.c.id.in_(stale + [fresh, verified]))).scalars().all()
+    assert sorted(users) == sorted([fresh, verified])
+    for table in (Verif_code, Cart, Order):
+        assert not session.execute(select(table.c.id).where(table.c.user_id.in_(stale))).first()
+    orders = select(Order.c.id).where(Order.c.user_id.in_(stale))
+    assert not session.execute(select(OrderItems.c.id).where(OrderItems.c.order_id.in_(orders))).first()
+    assert carts._carts == {fresh: {product_id: 1}}
+
+
+def test_cleanup_error_is_raised_for_retry(monkeypatch):
+    # Ошибка не проглатывается: Celery повторит задачу, а после
+    # max_retries отметит её как неуспешную
+    def fail(*args):
+        raise RuntimeError("database is gone")
+
+    monkeypatch.setattr(tasks, "delete_users_batch", fail)
+    with pytest.raises(RuntimeError):
+        tasks.delete_unverified_users()
+
+
+def test_cleanup_of_a_million_users_runs_in_flat_batches(session):
+    series = func.generate_series(1, CLEANUP_TEST_USERS).table_valued("value")
+    session.execute(
+        insert(User).from_select(
+            ["email", "role_id", "hashed_password", "is_verified", "created_at"],
+            select(
+                func.concat("bulk-", series.c.value, "@example.com"), literal(1), literal("x"), literal(False),
+                func.now() - timedelta(days=2)
+            )
+        )
+    )
+    session.commit()
+
+    durations = []
+    delete_users_batch = tasks.delete_users_batch
+
+    def timed(*args):
+        started = time.perf_counter()
+        try:
+            return delete_users_batch(*args)
+        finally:
+            durations.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(tasks, "delete_users_batch", timed)
+        deleted = tasks.delete_unverified_users()
+    elapsed = time.perf_counter() - started
+
+    assert deleted == CLEANUP_TEST_USERS
+    assert not session.execute(select(User.c.id).where(User.c.email.like("bulk-%")).limit(1)).first()
+
+    # Пачка — set-based DELETE по индексам: её время не растёт к концу таблицы
+    head, tail = durations[:10], durations[-11:-1]
+    report = f"{deleted} users in {elapsed:.1f} s, {len(durations) - 1} batches, max batch {max(durations) * 1000:.0f} ms"
+    assert sum(tail) / len(tail) < 3 * sum(head) / len(head) + 0.05, report
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import os
+import tracemalloc
+import httpx
+import pytest
+from sqlalchemy import func, literal, select
+
+# Строк в выгрузке; для быстрого прогона можно уменьшить
+EXPORT_TEST_ROWS = int(os.environ.get("EXPORT_TEST_ROWS", 1_000_000))
+
+
+class StreamingASGITransport(httpx.AsyncBaseTransport):
+    """
+    Транспорт тестового клиента, который отдаёт тело ответа по частям.
+
+    ASGITransport из httpx собирает всё тело в памяти до возврата
+    ответа, поэтому с ним память выгрузки не измерить. Очередь на одну
+    часть даёт обратное давление, как у сокета.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = b"".join([part async for part in request.stream])
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": request.method,
+            "scheme": request.url.scheme,
+            "path": request.url.path,
+            "raw_path": request.url.raw_path.split(b"?")[0],
+            "query_string": request.url.query,
+            "root_path": "",
+            "headers": [(key.lower(), value) for key, value in request.headers.raw],
+            "server": (request.url.host, request.url.port or 80),
+            "client": ("127.0.0.1", 50000),
+        }
+        chunks = asyncio.Queue(maxsize=1)
+        start = asyncio.get_running_loop().create_future()
+        disconnected = asyncio.Event()
+        received = False
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                start.set_result(message)
+            elif message["type"] == "http.response.body":
+                if message.get("body"):
+                    await chunks.put(message["body"])
+                if not message.get("more_body", False):
+                    await chunks.put(None)
+
+        task = asyncio.create_task(self.app(scope, receive, send))
+        await asyncio.wait({start, task}, return_when=asyncio.FIRST_COMPLETED)
+        if not start.done():
+            task.result()
+
+        async def stream():
+            try:
+                while (chunk := await chunks.get()) is not None:
+                    yield chunk
+                await task
+            finally:
+                disconnected.set()
+                if not task.done():
+                    task.cancel()
+
+        message = start.result()
+        return httpx.Response(message["status"], headers=message.get("headers", []), stream=StreamBody(stream()))
+
+
+class StreamBody(httpx.AsyncByteStream):
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def __aiter__(self):
+        async for chunk in self.chunks:
+            yield chunk
+
+    async def aclose(self):
+        await self.chunks.aclose()
+
+
+@pytest.fixture
+async def export_products(db, category):
+    # Товары генерирует PostgreSQL, поэтому в памяти процесса их нет,
+    # пока выгрузка сама не начнёт их накапливать
+    from product_management.models import Product
+
+    series = func.generate_series(1, EXPORT_TEST_ROWS).table_valued("value")
+    async with db.begin():
+        await db.execute(Product.insert().from_select(
+            ["name", "price", "description", "category_id", "is_available"],
+            select(
+                func.concat("Export ", series.c.value),
+                series.c.value,
+                func.repeat("x", 100),
+                literal(category),
+                literal(True),
+            )
+        ))
+
+    yield category
+
+    async with db.begin():
+        await db.execute(Product.delete().where(Product.c.category_id == category))
+
+
+async def test_export_streams_rows_in_constant_memory(seeded, admin_headers, export_products):
+    from main import app
+
+    size = lines = 0
+    async with httpx.AsyncClient(transport=StreamingASGITransport(app), base_url="http://test") as client:
+        tracemalloc.start()
+        try:
+            async with client.stream("GET", "/product/products/export", params={
+                "format": "csv", "filter": json.dumps({"category_id": export_products})
+            }, headers=admin_headers) as response:
+                assert response.status_code == 200
+                async for chunk in response.aiter_raw():
+                    size += len(chunk)
+                    lines += chunk.count(b"\n")
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    assert lines == EXPORT_TEST_ROWS + 1
+    # Пиковая память не зависит от числа строк: порядка одной пачки EXPORT_CHUNK_SIZE
+    assert peak < 32 * 1024 * 1024, f"peak {peak / 2**20:.1f} MiB for {size / 2**20:.1f} MiB of CSV"
+    assert peak < size / 4, f"peak {peak / 2**20:.1f} MiB for {size / 2**20:.1f} MiB of CSV"
@@ -0,0 +1,21 @@
+import http_cache
+
+
+async def test_catalog_etag_revalidation(client, admin_headers, product):
+    response = await client.get(f"/product/product/{product}")
+    etag = response.headers["ETag"]
+
+    response = await client.get(f"/product/product/{product}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    await client.patch(f"/product/product/{product}", json={"price": 110}, headers=admin_headers)
+    response = await client.get(f"/product/product/{product}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["price"] == 110
+
+
+def test_process_cache_etag_changes_after_restart(monkeypatch):
+    # Версия в кеше процесса после рестарта снова 0: ETag не должен совпасть
+    etag = http_cache.catalog_etag(0, "product:1")
+    monkeypatch.setattr(http_cache, "BOOT_ID", "restarted")
+    assert http_cache.catalog_etag(0, "product:1") != etag
@@ -0,0 +1,90 @@
+import asyncio
+import socket
+import pytest
+from aiosmtpd.controller import Controller
+import mailer
+from mailer import SMTPPool, build_message
+
+
+class Inbox:
+    """Обработчик aiosmtpd: запоминает письма и адрес клиента (у каждого соединения свой порт)."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((session.peer, envelope.rcpt_tos))
+        return "250 OK"
+
+
+class Server(Controller):
+    """SMTP-заглушка, которая помнит открытые соединения, чтобы их можно было оборвать."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connections = []
+
+    def factory(self):
+        protocol = super().factory()
+        self.connections.append(protocol)
+        return protocol
+
+    def drop_connections(self):
+        for protocol in self.connections:
+            self.loop.call_soon_threadsafe(protocol.transport.close)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    monkeypatch.setattr(mailer, "sender_email", "shop@example.com")
+    server = Server(Inbox(), hostname="127.0.0.1", port=free_port())
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+async def pool(smtp_server):
+    pool = SMTPPool(size=2, retries=1, backoff=0.01, hostname="127.0.0.1", port=smtp_server.port, start_tls=False)
+    yield pool
+    await pool.close()
+
+
+async def test_connection_is_reused(smtp_server, pool):
+    for number in range(3):
+        await pool.send(build_message(f"user{number}@example.com", "test", "body"))
+
+    assert pool.counters["connects"] == 1
+    assert pool.counters["reused"] == 2
+    peers = {peer for peer, _ in smtp_server.handler.messages}
+    assert len(smtp_server.handler.messages) == 3 and len(peers) == 1
+
+
+async def test_dead_connection_is_replaced(smtp_server, pool):
+    await pool.send(build_message("first@example.com", "test", "body"))
+    smtp_server.drop_connections()
+    await asyncio.sleep(0.1)
+
+    await pool.send(build_message("second@example.com", "test", "body"))
+
+    assert pool.counters["connects"] == 2
+    assert pool.counters["failed"] == 0
+    assert [rcpt for _, rcpt in smtp_server.handler.messages] == [["first@example.com"], ["second@example.com"]]
+    assert len({peer for peer, _ in smtp_server.handler.messages}) == 2
+
+
+async def test_batch_reports_errors_per_message(smtp_server, pool):
+    # Второе письмо уходит на сервер, где никто не слушает
+    down = SMTPPool(retries=1, backoff=0.01, hostname="127.0.0.1", port=free_port(), start_tls=False)
+    message = build_message("user@example.com", "test", "body")
+
+    assert await pool.send_batch([message]) == [None]
+    errors = await down.send_batch([message])
+    assert len(errors) == 1 and errors[0]
+    assert down.counters["failed"] == 1 and down.counters["retries"] == 1
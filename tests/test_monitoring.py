@@ -0,0 +1,65 @@
+from fastapi.routing import APIRoute
+from main import app
+from monitoring.budgets import ROUTE_BUDGETS
+
+
+def test_every_route_has_budget():
+    routes = {f"{method} {route.path}" for route in app.routes if isinstance(route, APIRoute) for method in route.methods}
+    assert routes - set(ROUTE_BUDGETS) == set()
+    assert set(ROUTE_BUDGETS) - routes == set()
+
+
+async def test_pool_stats(client, budget, admin_headers):
+    response = await budget("GET /monitoring/pool", client.get("/monitoring/pool", headers=admin_headers))
+    assert response.status_code == 200
+
+
+async def test_stats(client, budget, admin_headers):
+    response = await budget("GET /monitoring/stats", client.get("/monitoring/stats", headers=admin_headers))
+    assert response.status_code == 200
+
+
+async def test_metrics(client, budget, admin_headers):
+    response = await budget("GET /monitoring/metrics", client.get("/monitoring/metrics", headers=admin_headers))
+    assert response.status_code == 200
+    assert "http_request_duration_seconds" in response.text
+
+    types = dict(line.split()[2:4] for line in response.text.splitlines() if line.startswith("# TYPE"))
+    assert types["db_pool_connections"] == "gauge"
+    assert types["app_worker_info"] == "gauge"
+    # Счётчики — только метрики с суффиксом _total
+    assert all(name.endswith("_total") for name, kind in types.items() if kind == "counter")
+
+
+async def test_metrics_require_admin_without_token(client, user_headers):
+    assert (await client.get("/monitoring/metrics")).status_code == 403
+    assert (await client.get("/monitoring/metrics", headers=user_headers)).status_code == 423
+
+
+async def test_failed_statement_is_not_timed(db):
+    from sqlalchemy import text
+    from sqlalchemy.exc import DBAPIError
+    from monitoring.instrumentation import count_queries
+
+    with count_queries() as stats:
+        try:
+            await db.execute(text("SELECT 1 / 0"))
+        except DBAPIError:
+            await db.rollback()
+        await db.execute(text("SELECT 1"))
+        await db.rollback()
+
+    assert stats.statements == ["SELECT 1"]
+    assert stats.db_seconds < 1
+
+
+async def test_warm_up_pool_is_capped(database):
+    import time
+    from config import DB_MAX_OVERFLOW, DB_POOL_SIZE, DB_POOL_TIMEOUT
+    from database import warm_up_pool
+
+    started = time.perf_counter()
+    opened = await warm_up_pool(DB_POOL_SIZE + DB_MAX_OVERFLOW + 5)
+
+    assert opened == DB_POOL_SIZE + DB_MAX_OVERFLOW
+    assert time.perf_counter() - started < DB_POOL_TIMEOUT
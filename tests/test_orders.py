@@ -0,0 +1,183 @@
+import asyncio
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+
+
+async def test_create_order(client, budget, user_headers, seeded, empty_cart):
+    items = [{"product_id": product_id, "quantity": 2} for product_id in seeded.product_ids[:3]]
+    await client.post("/cart/cart/batch", json={"items": items}, headers=user_headers)
+
+    response = await budget("POST /order/order", client.post("/order/order", headers=user_headers))
+    assert response.status_code == 200
+    assert response.json()["new_order"]["user_id"] == seeded.user_id
+
+
+async def test_orders(client, budget, admin_headers):
+    response = await budget("GET /order/orders", client.get("/order/orders", params={
+        "filter": '{"status": "Оплачен"}', "sort_by": "created_at", "order": "desc"
+    }, headers=admin_headers))
+    assert response.status_code == 200
+    assert response.json()["data"]
+
+
+async def test_export_orders(client, budget, admin_headers):
+    response = await budget("GET /order/orders/export", client.get("/order/orders/export", params={"format": "ndjson"}, headers=admin_headers))
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) >= 500
+
+
+async def test_revenue(client, budget, admin_headers):
+    response = await budget("GET /order/orders/analytics/revenue", client.get("/order/orders/analytics/revenue", headers=admin_headers))
+    assert response.status_code == 200
+    assert response.json()["data"]
+
+
+async def test_top_products(client, budget, admin_headers):
+    response = await budget("GET /order/orders/analytics/top-products", client.get(
+        "/order/orders/analytics/top-products", params={"limit": 5}, headers=admin_headers
+    ))
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 5
+
+
+async def test_basket_stats(client, budget, admin_headers):
+    response = await budget("GET /order/orders/analytics/basket", client.get("/order/orders/analytics/basket", headers=admin_headers))
+    assert response.status_code == 200
+    assert response.json()["orders"] >= 500
+
+
+@pytest.fixture
+async def analytics_orders(db, seeded):
+    # Заказы в отдельные дни со своим статусом, чтобы агрегаты не зависели от сида:
+    # 1 января — 2 заказа (2 строки и 1 строка), 2 января — заказ без строк
+    from order_management.models import Order, OrderItems
+
+    status = f"Test {uuid.uuid4().hex[:8]}"
+    first, second = seeded.product_ids[:2]
+    day = datetime(2001, 1, 1, 12, tzinfo=timezone.utc)
+    async with db.begin():
+        result = await db.execute(
+            Order.insert().returning(Order.c.id),
+            [
+                {"user_id": seeded.user_id, "total_price": 500, "status": status, "created_at": day},
+                {"user_id": seeded.user_id, "total_price": 300, "status": status, "created_at": day},
+                {"user_id": seeded.user_id, "total_price": 100, "status": status, "created_at": day + timedelta(days=1)},
+            ]
+        )
+        order_ids = result.scalars().all()
+        await db.execute(OrderItems.insert(), [
+            {"order_id": order_ids[0], "product_id": first, "quantity": 2, "price": 100},
+            {"order_id": order_ids[0], "product_id": second, "quantity": 1, "price": 300},
+            {"order_id": order_ids[1], "product_id": first, "quantity": 3, "price": 100},
+        ])
+
+    yield SimpleNamespace(status=status, product_ids=(first, second), params={"date_from": "2001-01-01", "date_to": "2001-01-02", "status": status})
+
+    async with db.begin():
+        await db.execute(OrderItems.delete().where(OrderItems.c.order_id.in_(order_ids)))
+        await db.execute(Order.delete().where(Order.c.id.in_(order_ids)))
+
+
+async def test_basket_stats_aggregates(client, admin_headers, analytics_orders):
+    response = await client.get("/order/orders/analytics/basket", params=analytics_orders.params, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json() == {"orders": 3, "revenue": 900, "avg_total": 300.0, "avg_items": 2.0, "avg_lines": 1.0}
+
+
+async def test_revenue_aggregates(client, admin_headers, analytics_orders):
+    response = await client.get("/order/orders/analytics/revenue", params=analytics_orders.params, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["data"] == [
+        {"day": "2001-01-01", "status": analytics_orders.status, "orders": 2, "revenue": 800},
+        {"day": "2001-01-02", "status": analytics_orders.status, "orders": 1, "revenue": 100},
+    ]
+
+
+async def test_top_products_aggregates(client, admin_headers, analytics_orders):
+    response = await client.get("/order/orders/analytics/top-products", params=analytics_orders.params, headers=admin_headers)
+    assert response.status_code == 200
+    first, second = analytics_orders.product_ids
+    assert [
+        (row["product_id"], row["quantity"], row["revenue"], row["orders"]) for row in response.json()["data"]
+    ] == [(first, 5, 500, 2), (second, 1, 300, 1)]
+
+
+async def test_refresh_daily_revenue_view(db, analytics_orders):
+    import tasks
+    from order_management.schemas import AnalyticsParams
+    from order_management.unit import revenue_query
+
+    params = AnalyticsParams(date_from=date(2001, 1, 1), date_to=date(2001, 1, 2), status=analytics_orders.status)
+    # До обновления представление не видит новых заказов
+    assert (await db.execute(revenue_query(params, use_matview=True))).fetchall() == []
+
+    await asyncio.to_thread(tasks.refresh_order_daily_revenue)
+
+    from_view = (await db.execute(revenue_query(params, use_matview=True))).fetchall()
+    from_orders = (await db.execute(revenue_query(params))).fetchall()
+    await db.rollback()
+    assert [tuple(row) for row in from_view] == [tuple(row) for row in from_orders]
+    assert [(row.day, row.orders, row.revenue) for row in from_view] == [(date(2001, 1, 1), 2, 800), (date(2001, 1, 2), 1, 100)]
+
+
+async def test_get_order(client, budget, user_headers, order):
+    response = await budget("GET /order/order/{id}", client.get(f"/order/order/{order}", headers=user_headers))
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 1
+
+
+async def test_update_order_put(client, budget, admin_headers, order):
+    response = await budget("PUT /order/order/{id}", client.put(
+        f"/order/order/{order}", json={"total_price": 300, "status": "Оплачен"}, headers=admin_headers
+    ))
+    assert response.status_code == 200
+
+
+async def test_update_order_patch(client, budget, admin_headers, order):
+    response = await budget("PATCH /order/order/{id}", client.patch(f"/order/order/{order}", json={"status": "Отправлен"}, headers=admin_headers))
+    assert response.status_code == 200
+
+
+async def test_delete_order(client, budget, user_headers, order):
+    response = await budget("DELETE /order/order/{id}", client.delete(f"/order/order/{order}", headers=user_headers))
+    assert response.status_code == 200
+
+
+async def test_create_order_queries_do_not_grow_with_cart(client, user_headers, seeded, empty_cart, db, category):
+    # Строки заказа вставляются одним executemany: число запросов и время
+    # оформления не зависят от размера корзины
+    import time
+    from cart.models import Cart
+    from monitoring.instrumentation import count_queries
+    from product_management.models import Product
+
+    async with db.begin():
+        result = await db.execute(
+            Product.insert()
+            .values([
+                {"name": f"Bulk {number}", "price": 100, "description": "test product", "category_id": category, "is_available": True}
+                for number in range(500)
+            ])
+            .returning(Product.c.id)
+        )
+        product_ids = result.scalars().all()
+
+    queries, elapsed = {}, {}
+    # Первый заказ прогревает соединения и кеши и не учитывается
+    for size in (1, 1, 50, 500):
+        async with db.begin():
+            await db.execute(Cart.insert(), [
+                {"user_id": seeded.user_id, "product_id": product_id, "quantity": 1} for product_id in product_ids[:size]
+            ])
+        with count_queries() as stats:
+            started = time.perf_counter()
+            response = await client.post("/order/order", headers=user_headers)
+            elapsed[size] = time.perf_counter() - started
+        assert response.status_code == 200
+        assert response.json()["new_order"]["total_price"] == 100 * size
+        queries[size] = stats.queries
+
+    assert queries[1] == queries[50] == queries[500], queries
+    assert elapsed[500] < 5 * elapsed[1] + 0.1, elapsed
@@ -0,0 +1,92 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+from aiosmtplib import SMTPResponseException
+from sqlalchemy import insert, select
+from config import OUTBOX_MAX_ATTEMPTS, OUTBOX_RETRY_BASE_SECONDS, OUTBOX_RETRY_MAX_SECONDS
+from order_management.models import EmailOutbox
+import tasks
+from tasks import retry_delay
+
+
+def test_retry_delay_grows_exponentially_up_to_limit():
+    assert retry_delay(1) == timedelta(seconds=OUTBOX_RETRY_BASE_SECONDS)
+    assert retry_delay(2) == timedelta(seconds=min(2 * OUTBOX_RETRY_BASE_SECONDS, OUTBOX_RETRY_MAX_SECONDS))
+    assert retry_delay(30) == timedelta(seconds=OUTBOX_RETRY_MAX_SECONDS)
+
+
+@pytest.fixture
+def outbox(database, monkeypatch):
+    """
+    Письма в outbox с уникальными адресатами; отправка подменяется:
+    outcomes[адресат] — None (доставлено) или исключение SMTP.
+    """
+    tag = uuid.uuid4().hex[:8]
+    outcomes = {}
+
+    async def send_messages(messages):
+        return [outcomes.get(message["To"]) for message in messages]
+
+    monkeypatch.setattr(tasks, "send_messages", send_messages)
+
+    with tasks.get_session_factory()() as session:
+        def add(name: str, outcome=None) -> int:
+            recipient = f"{name}-{tag}@example.com"
+            outcomes[recipient] = outcome
+            email_id = session.execute(
+                insert(EmailOutbox).values(recipient=recipient, subject="test", body="test").returning(EmailOutbox.c.id)
+            ).scalar_one()
+            session.commit()
+            return email_id
+
+        def row(email_id: int):
+            session.rollback()
+            return session.execute(select(EmailOutbox).where(EmailOutbox.c.id == email_id)).one()
+
+        yield SimpleNamespace(add=add, row=row)
+
+
+def test_sent_email_is_marked_sent(outbox):
+    email_id = outbox.add("ok")
+    tasks.send_outbox_emails()
+
+    email = outbox.row(email_id)
+    assert email.sent_at is not None
+    assert email.attempts == 1 and email.last_error is None
+
+
+def test_temporary_failure_is_rescheduled_with_backoff(outbox):
+    email_id = outbox.add("busy", SMTPResponseException(451, "Try again later"))
+    tasks.send_outbox_emails()
+
+    email = outbox.row(email_id)
+    assert email.sent_at is None
+    assert email.attempts == 1 and "Try again later" in email.last_error
+    delay = email.next_attempt_at - datetime.now(timezone.utc)
+    assert timedelta(seconds=OUTBOX_RETRY_BASE_SECONDS - 30) < delay <= retry_delay(1)
+
+    # До next_attempt_at письмо не выбирается повторно
+    tasks.send_outbox_emails()
+    assert outbox.row(email_id).attempts == 1
+
+
+def test_permanent_failure_is_dead_lettered(outbox):
+    email_id = outbox.add("unknown", SMTPResponseException(550, "No such user"))
+    tasks.send_outbox_emails()
+
+    email = outbox.row(email_id)
+    assert email.sent_at is None and email.next_attempt_at is None
+    assert email.attempts == OUTBOX_MAX_ATTEMPTS and "No such user" in email.last_error
+
+
+def test_locked_email_is_skipped(outbox):
+    # Письмо, которое держит другой запуск задачи, не отправляется повторно
+    locked_id, free_id = outbox.add("locked"), outbox.add("free")
+    with tasks.get_session_factory()() as other:
+        other.execute(select(EmailOutbox.c.id).where(EmailOutbox.c.id == locked_id).with_for_update())
+        tasks.send_outbox_emails()
+        other.rollback()
+
+    assert outbox.row(locked_id).sent_at is None
+    assert outbox.row(free_id).sent_at is not None
@@ -0,0 +1,53 @@
+import pytest
+from pagination import encode_cursor
+
+
+async def test_cursor_pages_match_offset_pages(client):
+    params = {"sort_by": "price", "order": "desc", "page_size": 10}
+    first = (await client.get("/product/products", params=params)).json()
+    by_offset = (await client.get("/product/products", params={**params, "page": 2})).json()
+    by_cursor = (await client.get("/product/products", params={**params, "after": first["next_cursor"]})).json()
+
+    assert [product["id"] for product in by_cursor["data"]] == [product["id"] for product in by_offset["data"]]
+
+    back = (await client.get("/product/products", params={**params, "before": by_cursor["prev_cursor"]})).json()
+    assert [product["id"] for product in back["data"]] == [product["id"] for product in first["data"]]
+
+
+async def test_deep_pages_use_keyset(client):
+    # Каждая страница — один запрос без OFFSET, сколько бы страниц ни было до неё
+    from monitoring.instrumentation import count_queries
+
+    params = {"sort_by": "price", "page_size": 10}
+    cursor, seen = None, []
+    while True:
+        with count_queries() as stats:
+            page = (await client.get("/product/products", params={**params, **({"after": cursor} if cursor else {})})).json()
+        seen += [product["id"] for product in page["data"]]
+        if cursor:
+            assert stats.queries == 1
+            assert "OFFSET" not in stats.statements[0]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen)) >= 200
+
+
+@pytest.mark.parametrize("sort_by, value", [
+    ("price", "abc"),
+    ("price", True),
+    ("name", 5),
+    ("id", "1"),
+])
+async def test_forged_cursor_is_rejected(client, sort_by, value):
+    response = await client.get("/product/products", params={"sort_by": sort_by, "after": encode_cursor(sort_by, value, 1)})
+    assert response.status_code == 400
+
+
+async def test_forged_date_cursor_is_rejected(client, admin_headers):
+    for value in ("not-a-date", 12345):
+        response = await client.get(
+            "/order/orders", params={"sort_by": "created_at", "after": encode_cursor("created_at", value, 1)}, headers=admin_headers
+        )
+        assert response.status_code == 400
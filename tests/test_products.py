@@ -0,0 +1,140 @@
+import pytest
+
+
+async def test_add_product(client, budget, admin_headers, category):
+    response = await budget("POST /product/product", client.post("/product/product", json={
+        "name": "Test grinder", "price": 1500, "description": "test", "category_id": category, "is_available": True
+    }, headers=admin_headers))
+    assert response.status_code == 200
+
+
+async def test_import_products(client, budget, admin_headers, category, product):
+    response = await budget("POST /product/products/import", client.post("/product/products/import", json=[
+        {"id": product, "name": "Updated", "price": 200, "description": "test", "category_id": category},
+        {"name": "Imported", "price": 300, "category_id": category},
+        {"name": "Broken", "price": "free", "category_id": category},
+    ], headers=admin_headers))
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 1
+    assert response.json()["updated"] == 1
+    assert not response.json()["status"]
+    assert [error["row"] for error in response.json()["errors"]] == [3]
+    assert "price" in response.json()["errors"][0]["detail"]
+
+
+def import_csv(category: int) -> str:
+    # Вторая строка без описания, третья — с неизвестной категорией, четвёртая — без цены
+    return (
+        "name,price,description,category_id\n"
+        f"CSV one,100,csv,{category}\n"
+        f"CSV two,200,,{category}\n"
+        "CSV three,300,csv,0\n"
+        f"CSV four,,csv,{category}\n"
+    )
+
+
+def assert_csv_import(response):
+    assert response.status_code == 200
+    body = response.json()
+    assert body["inserted"] == 2 and body["updated"] == 0
+    assert [error["row"] for error in body["errors"]] == [3, 4]
+    assert body["errors"][0]["detail"] == "Category with id 0 not found"
+    assert "price" in body["errors"][1]["detail"]
+
+
+async def test_import_products_csv(client, admin_headers, category):
+    response = await client.post(
+        "/product/products/import",
+        content=import_csv(category),
+        headers={**admin_headers, "Content-Type": "text/csv"}
+    )
+    assert_csv_import(response)
+
+
+async def test_import_products_multipart(client, admin_headers, category):
+    response = await client.post(
+        "/product/products/import",
+        files={"file": ("products.csv", import_csv(category).encode(), "text/csv")},
+        headers=admin_headers
+    )
+    assert_csv_import(response)
+
+
+def test_import_products_openapi_body():
+    from main import app
+
+    body = app.openapi()["paths"]["/product/products/import"]["post"]["requestBody"]
+    assert set(body["content"]) == {"application/json", "text/csv", "multipart/form-data"}
+    assert "description" not in body["content"]["application/json"]["schema"]["items"]["required"]
+
+
+async def test_products(client, budget, category):
+    response = await budget("GET /product/products", client.get("/product/products", params={
+        "filter": '{"category_id": %d}' % category, "search": "Test", "page_size": 10
+    }))
+    assert response.status_code == 200
+
+
+async def test_export_products(client, budget, admin_headers):
+    response = await budget("GET /product/products/export", client.get("/product/products/export", headers=admin_headers))
+    assert response.status_code == 200
+    # Заголовок и по строке на товар
+    assert len(response.text.splitlines()) > 100
+
+
+async def test_product(client, budget, product):
+    response = await budget("GET /product/product/{id}", client.get(f"/product/product/{product}"))
+    assert response.status_code == 200
+    assert response.json()["id"] == product
+
+
+async def test_update_product_put(client, budget, admin_headers, category, product):
+    response = await budget("PUT /product/product/{id}", client.put(f"/product/product/{product}", json={
+        "name": "Renamed", "price": 150, "description": "test", "category_id": category, "is_available": True
+    }, headers=admin_headers))
+    assert response.status_code == 200
+
+
+async def test_update_product_patch(client, budget, admin_headers, category, product):
+    response = await budget("PATCH /product/product/{id}", client.patch(
+        f"/product/product/{product}", json={"price": 120, "category_id": category}, headers=admin_headers
+    ))
+    assert response.status_code == 200
+
+
+async def test_delete_product(client, budget, admin_headers, product):
+    response = await budget("DELETE /product/product/{id}", client.delete(f"/product/product/{product}", headers=admin_headers))
+    assert response.status_code == 200
+
+
+async def test_large_page_matches_response_model(client):
+    # Ответ без повторной валидации (serialization.trusted_response)
+    # должен совпадать с тем, что дал бы response_model
+    from product_management.schemas import ProductsResponse
+
+    response = await client.get("/product/products", params={"page_size": 500, "sort_by": "price"})
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["data"]) >= 200
+    assert ProductsResponse.model_validate(body).model_dump(mode="json") == body
+
+
+@pytest.mark.parametrize("filter", [
+    '{"price": "abc"}',
+    '{"price": {"gte": true}}',
+    '{"price": 1.5}',
+    '{"price": 99999999999}',
+    '{"price": {"prefix": "1"}}',
+    '{"is_available": "x"}',
+    '{"category_id": {"in": [1, "two"]}}',
+    '{"name": {"eq": ["a"]}}',
+])
+async def test_invalid_filter_value_is_rejected(client, filter):
+    response = await client.get("/product/products", params={"filter": filter})
+    assert response.status_code == 400
+
+
+async def test_filter_values_are_coerced(client, product):
+    response = await client.get("/product/products", params={"filter": '{"id": "%d", "price": {"gte": 100.0}}' % product})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["data"]] == [product]
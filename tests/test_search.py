@@ -0,0 +1,78 @@
+import uuid
+import pytest
+from search_index import TrigramIndex, word_similarity
+
+
+def test_word_similarity_matches_pg_trgm():
+    # Значения word_similarity из pg_trgm для тех же строк
+    assert word_similarity("frappe", "Iced frappe") == 1.0
+    assert word_similarity("frappe", "Frappemaker") == pytest.approx(6 / 7)
+    assert word_similarity("frappe", "Icefrappe") == pytest.approx(5 / 7)
+    assert word_similarity("frappe", "green tea") == 0.0
+
+
+def test_index_scores_only_substring_matches():
+    index = TrigramIndex()
+    index.rebuild([(1, "Frappe", None), (2, "Mug", "for frappemaker fans"), (3, "Frap", "cup")], version=0)
+
+    assert index.scores("FRAPPE") == {1: 1.0, 2: pytest.approx(6 / 7)}
+
+
+@pytest.fixture
+async def ranked_products(db, category):
+    # Названия с уникальной меткой, чтобы поиск не находил товары из seed
+    from product_management.models import Product
+
+    tag = uuid.uuid4().hex[:6]
+    names = [f"Icefrappe{tag}", f"Frappe{tag}", f"Frappe{tag}maker"]
+    async with db.begin():
+        result = await db.execute(
+            Product.insert()
+            .values([
+                {"name": name, "price": 100, "description": "test product", "category_id": category, "is_available": True}
+                for name in names
+            ])
+            .returning(Product.c.id)
+        )
+    return f"frappe{tag}", result.scalars().all()
+
+
+@pytest.mark.parametrize("backend", ["trgm", "memory"])
+async def test_search_is_ranked(client, monkeypatch, ranked_products, backend):
+    from product_management.unit import product_search_index
+
+    monkeypatch.setattr("product_management.unit.SEARCH_BACKEND", backend)
+    monkeypatch.setattr(product_search_index, "version", None)
+    search, (partial, exact, prefix) = ranked_products
+
+    response = await client.get("/product/products", params={"search": search})
+    assert response.status_code == 200
+    assert [product["id"] for product in response.json()["data"]] == [exact, prefix, partial]
+
+
+async def test_ranked_pages_cover_every_row_once(client):
+    everything = (await client.get("/product/products", params={"search": "latte", "page_size": 500})).json()["data"]
+    assert len(everything) > 20
+
+    seen, page = [], 1
+    while True:
+        body = (await client.get("/product/products", params={"search": "latte", "page_size": 7, "page": page})).json()
+        # Курсоры не выдаются: у релевантности нет ключа для keyset
+        assert body["next_cursor"] is None and body["prev_cursor"] is None
+        if not body["data"]:
+            break
+        seen += [product["id"] for product in body["data"]]
+        page += 1
+
+    assert seen == [product["id"] for product in everything]
+
+
+async def test_ranked_search_rejects_cursor(client):
+    from pagination import encode_cursor
+
+    response = await client.get("/product/products", params={"search": "latte", "after": encode_cursor("id", 1, 1)})
+    assert response.status_code == 400
+
+    # С явной сортировкой поиск листается курсорами
+    response = await client.get("/product/products", params={"search": "latte", "sort_by": "price", "page_size": 5})
+    assert response.json()["next_cursor"]
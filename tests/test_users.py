@@ -0,0 +1,41 @@
+async def test_me(client, budget, user_headers):
+    response = await budget("POST /user/me", client.post("/user/me", headers=user_headers))
+    assert response.status_code == 200
+    assert response.json()["email"] == "loadtest-user-1@example.com"
+
+
+async def test_users(client, budget, admin_headers):
+    response = await budget("GET /user/users", client.get("/user/users", params={"sort_by": "email", "page_size": 5}, headers=admin_headers))
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+    assert "X-Next-Cursor" in response.headers
+
+
+async def test_export_users(client, budget, admin_headers):
+    response = await budget("GET /user/users/export", client.get("/user/users/export", headers=admin_headers))
+    assert response.status_code == 200
+    assert "hashed_password" not in response.text
+
+
+async def test_get_user(client, budget, admin_headers, seeded):
+    response = await budget("GET /user/user/{id}", client.get(f"/user/user/{seeded.user_id}", headers=admin_headers))
+    assert response.status_code == 200
+
+
+async def test_update_user_put(client, budget, headers_for, new_user):
+    response = await budget("PUT /user/user/{id}", client.put(
+        f"/user/user/{new_user}", json={"username": "renamed"}, headers=await headers_for(new_user)
+    ))
+    assert response.status_code == 200
+
+
+async def test_update_user_patch(client, budget, headers_for, new_user):
+    response = await budget("PATCH /user/user/{id}", client.patch(
+        f"/user/user/{new_user}", json={"phone": "+70000000000"}, headers=await headers_for(new_user)
+    ))
+    assert response.status_code == 200
+
+
+async def test_delete_user(client, budget, admin_headers, new_user):
+    response = await budget("DELETE /user/user/{id}", client.delete(f"/user/user/{new_user}", headers=admin_headers))
+    assert response.status_code == 200
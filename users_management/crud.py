@@ -1,15 +1,20 @@
 import json
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy import and_, asc, delete, desc, or_, select, update
 from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from auth.security import check_admin, check_user
+from auth.security import check_admin, check_user, role_cache
 from users_management.schemas import *
 from auth.models import *
 from cart.models import *
 from order_management.models import *
+from cart.store import cart_store
 from database import get_db
+from users_management.unit import get_user_info, invalidate_user_info, user_query
+from pagination import page_cursors
+from export import stream_export
+from serialization import trusted_response
 
 router = APIRouter()
 
@@ -18,100 +23,58 @@ async def me(
     payload=Depends(check_user),
     db: AsyncSession = Depends(get_db)
 ) -> UserInfo:
-    user_id = payload["sub"]
-
-    # Получение данных пользователя
-    user_stmt = select(User).where(User.c.id == user_id)
-    user_result = await db.execute(user_stmt)
-    user = user_result.fetchone()
-
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Получение данных корзины
-    cart_stmt = select(Cart.c.product_id, Cart.c.quantity).where(Cart.c.user_id == user_id)
-    cart_result = await db.execute(cart_stmt)
-    cart_items = cart_result.fetchall()
-
-    # Получение данных заказов
-    orders_stmt = select(Order.c.id, Order.c.total_price, Order.c.status).where(Order.c.user_id == user_id)
-    orders_result = await db.execute(orders_stmt)
-    order_items = orders_result.fetchall()
-
-    return UserInfo(
-        email=user.email,
-        role_id=user.role_id,
-        username=user.username,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        phone=user.phone,
-        is_verified=user.is_verified,
-        cart=[
-            {"product_id": item.product_id, "quantity": item.quantity} for item in cart_items
-        ],
-        orders=[
-            {"id": order.id, "total_price": order.total_price, "status": order.status} for order in order_items
-        ]
-    )
+    user_info = await get_user_info(payload["sub"], db)
+
+    return trusted_response(user_info)
 
 @router.get("/users", response_model=list[UserBaseInfo])
 async def get_users(
+    response: Response,
     payload=Depends(check_admin),
     query_params: QueryParams = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
-    query = select(User)
-    
-    # Фильтры
-    if query_params.filter:
-        try:
-            filters_dict = json.loads(query_params.filter)
-            filters = [
-                getattr(User.c, field) == value
-                for field, value in filters_dict.items()
-                if hasattr(User.c, field)
-            ]
-            if filters:
-                query = query.where(and_(*filters))
-        except json.JSONDecodeError:
-            return JSONResponse(content={"detail": "Invalid filter format. Please provide a valid JSON string."}, status_code=400)
-
-    # Поиск
-    if query_params.search:
-        search_filter = or_(
-            User.c.username.ilike(f"%{query_params.search}%"),
-            User.c.first_name.ilike(f"%{query_params.search}%"),
-            User.c.last_name.ilike(f"%{query_params.search}%"),
-            User.c.email.ilike(f"%{query_params.search}%"),
-            User.c.phone.ilike(f"%{query_params.search}%")
-        )
-        query = query.where(search_filter)
+    query = user_query.apply(select(User), query_params)
 
-    # Сортировка
-    if query_params.sort_by and hasattr(User.c, query_params.sort_by):
-        order_by_column = getattr(User.c, query_params.sort_by)
-        query = query.order_by(asc(order_by_column) if query_params.order == "asc" else desc(order_by_column))
-    
-    # Пагинация
-    offset = (query_params.page - 1) * query_params.page_size
-    query = query.offset(offset).limit(query_params.page_size)
+    # Сортировка и пагинация (хеш пароля не должен попасть в курсор)
+    query, sort_column = user_query.paginate(query, query_params)
 
     result = await db.execute(query)
-    users = result.fetchall()
-
-    return [
-        UserBaseInfo(
-            id=user.id,
-            email=user.email,
-            role_id=user.role_id,
-            username=user.username,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            phone=user.phone,
-            is_verified=user.is_verified,
-        )
+    users, next_cursor, prev_cursor = page_cursors(result.fetchall(), sort_column, query_params)
+
+    # Ответ — список, поэтому курсоры передаются в заголовках
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if prev_cursor:
+        response.headers["X-Prev-Cursor"] = prev_cursor
+
+    return trusted_response([
+        {
+            "id": user.id,
+            "email": user.email,
+            "role_id": user.role_id,
+            "username": user.username,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "phone": user.phone,
+            "is_verified": user.is_verified,
+        }
         for user in users
-    ]
+    ], response)
+
+@router.get("/users/export")
+async def export_users(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    payload=Depends(check_admin),
+    query_params: QueryParams = Depends()
+):
+    # Те же фильтры, поиск и сортировка, что у /users; хеш пароля не выгружается
+    columns = [column for column in User.c if column.name != "hashed_password"]
+    query = user_query.apply(select(*columns), query_params)
+    query = user_query.sort(query, query_params)
+
+    return stream_export(query, "users", fmt)
+
 
 @router.get("/user/{id}", response_model=UserInfo)
 async def get_user(
@@ -119,39 +82,9 @@ async def get_user(
     payload=Depends(check_admin),
     db: AsyncSession = Depends(get_db)
 ):
-    # Получение данных пользователя
-    user_stmt = select(User).where(User.c.id == id)
-    user_result = await db.execute(user_stmt)
-    user = user_result.fetchone()
-
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Получение данных корзины
-    cart_stmt = select(Cart.c.product_id, Cart.c.quantity).where(Cart.c.user_id == id)
-    cart_result = await db.execute(cart_stmt)
-    cart_items = cart_result.fetchall()
-
-    # Получение данных заказов
-    orders_stmt = select(Order.c.id, Order.c.total_price, Order.c.status).where(Order.c.user_id == id)
-    orders_result = await db.execute(orders_stmt)
-    order_items = orders_result.fetchall()
-
-    return UserInfo(
-        email=user.email,
-        role_id=user.role_id,
-        username=user.username,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        phone=user.phone,
-        is_verified=user.is_verified,
-        cart=[
-            {"product_id": item.product_id, "quantity": item.quantity} for item in cart_items
-        ],
-        orders=[
-            {"id": order.id, "total_price": order.total_price, "status": order.status} for order in order_items
-        ]
-    )
+    user_info = await get_user_info(id, db)
+
+    return trusted_response(user_info)
 
 @router.put("/user/{id}", response_model=UserResponse)
 async def update_user(
@@ -180,6 +113,9 @@ async def update_user(
             detail="Internal Server Error: Could not update user"
         )
     
+    await role_cache.delete(id)
+    await invalidate_user_info(id)
+
     return UserResponse(status=True, update_data=update_data)
 
 @router.patch("/user/{id}", response_model=UserResponse)
@@ -218,6 +154,9 @@ async def update_user(
             detail="Internal Server Error: Could not update user"
         )
     
+    await role_cache.delete(id)
+    await invalidate_user_info(id)
+
     return UserResponse(status=True, update_data=update_data)
 
 
@@ -234,10 +173,9 @@ async def delete_user(
             if not user:
                 raise HTTPException(status_code=404, detail="User not found")
             
-            order_query = await db.execute(select(Order).where(Order.c.user_id == id))
-            oreder_id = order_query.fetchone()
-            if oreder_id:
-                await db.execute(OrderItems.delete().where(OrderItems.c.order_id == oreder_id.id))
+            # Строки всех заказов пользователя одним запросом
+            order_ids = select(Order.c.id).where(Order.c.user_id == id)
+            await db.execute(OrderItems.delete().where(OrderItems.c.order_id.in_(order_ids)))
             await db.execute(Order.delete().where(Order.c.user_id == id))
             await db.execute(Cart.delete().where(Cart.c.user_id == id))
             await db.execute(User.delete().where(User.c.id == id))
@@ -251,4 +189,8 @@ async def delete_user(
             status_code=500,
             detail="Internal Server Error: Could not delete user"
         )
+    if not cart_store.in_database:
+        await cart_store.clear(id, db)
+    await role_cache.delete(id)
+    await invalidate_user_info(id)
     return DeleteUserResponse(status=True, message="User deleted")
\ No newline at end of file
@@ -1,5 +1,6 @@
 from typing import List, Optional
 from pydantic import BaseModel
+from query_engine import ListQueryParams
 
 class CartItem(BaseModel):
     product_id: int
@@ -48,10 +49,5 @@ class UserResponse(BaseModel):
     status: bool
     update_data: UserInfoUpdatePut
 
-class QueryParams(BaseModel):
-    sort_by: Optional[str] = None  # Поле для сортировки
-    order: Optional[str] = "asc"  # Порядок сортировки: asc (по возрастанию) или desc (по убыванию)
-    search: Optional[str] = None  # Поиск по тексту
-    filter: Optional[str] = None  # Фильтры как строка в формате JSON
-    page: int = 1  # Номер страницы
-    page_size: int = 10  # Количество записей на странице
\ No newline at end of file
+class QueryParams(ListQueryParams):
+    pass
\ No newline at end of file
@@ -0,0 +1,73 @@
+from fastapi import HTTPException
+from sqlalchemy import JSON, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from auth.models import User
+from cache import Cache
+from cart.models import Cart
+from cart.store import cart_store
+from config import USER_INFO_CACHE_TTL
+from order_management.models import Order
+from query_engine import QueryEngine
+
+# Короткий кеш страницы аккаунта; сбрасывается при изменении
+# корзины, заказов и данных пользователя
+user_info_cache = Cache("user_info", ttl=USER_INFO_CACHE_TTL)
+
+# Хеш пароля не участвует ни в фильтрах, ни в сортировке
+user_query = QueryEngine(
+    User,
+    search=("username", "first_name", "last_name", "email", "phone"),
+    filterable=("id", "email", "username", "role_id", "is_verified", "created_at"),
+    sortable=("email", "username", "role_id", "created_at")
+)
+
+
+def json_list(table, **fields):
+    # Строки связанной таблицы пользователя одним JSON-массивом
+    item = func.json_build_object(*[arg for name, column in fields.items() for arg in (name, column)])
+    return (
+        select(func.coalesce(func.json_agg(aggregate_order_by(item, table.c.id)), literal_column("'[]'::json"), type_=JSON))
+        .where(table.c.user_id == User.c.id)
+        .scalar_subquery()
+    )
+
+
+async def get_user_info(user_id: int, db: AsyncSession) -> dict:
+    """Пользователь вместе с корзиной и заказами за один запрос к БД."""
+    async def load():
+        # Корзина вне Postgres (CART_BACKEND=redis) читается из своего хранилища
+        if cart_store.in_database:
+            cart = json_list(Cart, product_id=Cart.c.product_id, quantity=Cart.c.quantity)
+        else:
+            cart = literal_column("'[]'::json", type_=JSON)
+        orders = json_list(Order, id=Order.c.id, total_price=Order.c.total_price, status=Order.c.status)
+
+        result = await db.execute(
+            select(
+                User.c.email,
+                User.c.role_id,
+                User.c.username,
+                User.c.first_name,
+                User.c.last_name,
+                User.c.phone,
+                User.c.is_verified,
+                cart.label("cart"),
+                orders.label("orders"),
+            ).where(User.c.id == user_id)
+        )
+        user = result.fetchone()
+
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        user_info = dict(user._mapping)
+        if not cart_store.in_database:
+            user_info["cart"] = await cart_store.items(user_id, db)
+        return user_info
+
+    return await user_info_cache.get_or_load(user_id, load)
+
+
+async def invalidate_user_info(user_id: int):
+    await user_info_cache.delete(user_id)
\ No newline at end of file